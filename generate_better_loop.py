@@ -3,16 +3,18 @@
 
 import os
 from pathlib import Path
-from resonantgen import MusicWorkstation
+from types import MappingProxyType
+from resonantgen import get_workstation
 from resonantgen.core.prompt_processor import PromptProcessor
 
-# Better prompt templates for MusicGen
-BETTER_TRACK_TEMPLATES = {
-    "drums": "drums only, {genre} drums, {tempo} BPM, crisp and clear, professional mixing, high quality recording",
-    "bass": "bass only, {genre} bass line, {tempo} BPM, warm and deep, professional mixing, high quality recording", 
-    "harmony": "chords only, {genre} chord progression, {tempo} BPM, smooth and musical, professional mixing, high quality recording",
-    "melody": "lead melody only, {genre} melodic line, {tempo} BPM, catchy and musical, professional mixing, high quality recording"
-}
+class BetterPromptProcessor(PromptProcessor):
+    """PromptProcessor with better prompt templates for MusicGen."""
+    TRACK_TEMPLATES = MappingProxyType({
+        "drums": "drums only, {genre} drums, {tempo} BPM, crisp and clear, professional mixing, high quality recording",
+        "bass": "bass only, {genre} bass line, {tempo} BPM, warm and deep, professional mixing, high quality recording", 
+        "harmony": "chords only, {genre} chord progression, {tempo} BPM, smooth and musical, professional mixing, high quality recording",
+        "melody": "lead melody only, {genre} melodic line, {tempo} BPM, catchy and musical, professional mixing, high quality recording"
+    })
 
 def main():
     print("🎵 ResonantGen - Generating Better Quality Audio Loop")
@@ -25,16 +27,16 @@ def main():
     # Initialize with custom parameters
     print("\n1. Initializing with improved settings...")
     
-    # Temporarily patch the prompt templates
-    original_templates = PromptProcessor.TRACK_TEMPLATES.copy()
-    PromptProcessor.TRACK_TEMPLATES = BETTER_TRACK_TEMPLATES
+    # Initialize workstation (no audio cache: every run should give new samples)
+    maw = get_workstation("small")
     
-    # Initialize workstation
-    maw = MusicWorkstation(model_size="small")
+    # Use the better templates on the (shared) workstation for this script
+    original_processor = maw.prompt_processor
+    maw.prompt_processor = BetterPromptProcessor()
     
-    # Also patch the guidance scale for less extreme generation
-    original_guidance = maw.engine.model.generation_config.guidance_scale
-    maw.engine.model.generation_config.guidance_scale = 2.0  # Lower for more natural sound
+    # Also lower the guidance scale for less extreme generation
+    original_guidance = maw.engine.generation_params["guidance_scale"]
+    maw.engine.set_generation_params(guidance_scale=2.0)  # Lower for more natural sound
     
     print("✅ MusicWorkstation ready with improved settings")
     
@@ -47,11 +49,12 @@ def main():
     
     print("\n2. Testing different musical styles...")
     
-    for i, prompt in enumerate(prompts_to_try):
+    # Every stem of every style in one batched generation
+    sessions = maw.generate_many(prompts_to_try)
+    
+    for i, (prompt, session) in enumerate(zip(prompts_to_try, sessions)):
         print(f"\n--- Style {i+1}: {prompt.split(' at ')[0]} ---")
         
-        session = maw.generate(prompt)
-        
         # Save this style
         style_dir = output_dir / f"style_{i+1}"
         style_dir.mkdir(exist_ok=True)
@@ -67,9 +70,8 @@ def main():
         
         print(f"✅ Saved to {style_dir}/")
     
-    # Restore original settings
-    PromptProcessor.TRACK_TEMPLATES = original_templates
-    maw.engine.model.generation_config.guidance_scale = original_guidance
+    # Restore the original guidance scale
+    maw.engine.set_generation_params(guidance_scale=original_guidance)
     
     print(f"\n🎉 Generated 3 different styles with better prompts!")
     print(f"Output saved to: {output_dir.absolute()}")
@@ -90,6 +92,10 @@ def main():
     session.export(final_dir / "mixed.wav", stems=False)
     
     print(f"✅ Final version saved to {final_dir}/")
+    
+    # Restore the original prompt processor
+    maw.prompt_processor = original_processor
+    
     print("\n🎵 Try these files - they should sound much better!")
 
 if __name__ == "__main__":
@@ -3,8 +3,26 @@
 
 import torch
 from pathlib import Path
-from resonantgen.core.musicgen_engine import MusicGenEngine
-from resonantgen.core.track_session import AudioTrack
+from transformers import LogitsProcessor, LogitsProcessorList
+from resonantgen import get_workstation
+from resonantgen.core.track_session import AudioTrack, _to_pcm16
+
+
+class PerSampleTemperature(LogitsProcessor):
+    """Apply a different sampling temperature to each sample in a batch."""
+    
+    def __init__(self, temperatures, num_codebooks):
+        self.temperatures = torch.tensor(temperatures)
+        self.num_codebooks = num_codebooks
+    
+    def __call__(self, input_ids, scores):
+        # MusicGen scores are [batch * num_codebooks, vocab], sample-major; when
+        # this runs before guidance the unconditional half is stacked below
+        per_row = self.temperatures.to(scores.device, scores.dtype)
+        per_row = per_row.repeat_interleave(self.num_codebooks)
+        per_row = per_row.repeat(scores.shape[0] // per_row.shape[0])
+        return scores / per_row[:, None]
+
 
 def test_musicgen_direct():
     """Test MusicGen directly with different prompts and settings."""
@@ -18,7 +36,9 @@ def test_musicgen_direct():
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Initialize engine
-    engine = MusicGenEngine(model_size="small")
+    engine = get_workstation("small").engine
+    
+    pending_exports = []  # WAV writes overlap with the next generation
     
     # Test different guidance scales
     print("\n1. Testing different guidance scales...")
@@ -27,14 +47,11 @@ def test_musicgen_direct():
     for guidance in guidance_tests:
         print(f"\n   Testing guidance_scale={guidance}")
         
-        # Temporarily modify the generation config
-        engine.model.generation_config.guidance_scale = guidance
-        
         # Use a very explicit positive prompt
         prompt = "happy upbeat pop music, major key, bright cheerful melody, professional studio quality, radio hit, 120 BPM"
         
         # Generate
-        audio = engine.generate(prompt, duration=4.0)
+        audio = engine.generate(prompt, duration=4.0, guidance_scale=guidance)
         
         # Save
         track = AudioTrack(
@@ -45,7 +62,7 @@ def test_musicgen_direct():
         )
         
         output_path = output_dir / f"guidance_{guidance}.wav"
-        track.export(str(output_path))
+        pending_exports.append(track.export_async(str(output_path)))
         print(f"   ✅ Saved {output_path.name}")
     
     # Test different prompt styles
@@ -71,15 +88,18 @@ def test_musicgen_direct():
         ("technical", "4/4 time signature, C major, quarter note = 110 BPM, verse-chorus structure")
     ]
     
-    # Reset to default guidance
-    engine.model.generation_config.guidance_scale = 2.5
+    # All prompts share a duration, so generate them in one batch
+    print(f"\n   Generating {len(prompt_tests)} prompt styles in one batch...")
+    audio_batch = engine.generate_batch(
+        [prompt for _, prompt in prompt_tests],
+        duration=4.0,
+        guidance_scale=2.5
+    )
     
-    for name, prompt in prompt_tests:
+    for (name, prompt), audio in zip(prompt_tests, audio_batch):
         print(f"\n   Testing: {name}")
         print(f"   Prompt: {prompt}")
         
-        audio = engine.generate(prompt, duration=4.0)
-        
         track = AudioTrack(
             data=audio,
             sample_rate=engine.sample_rate,
@@ -88,7 +108,7 @@ def test_musicgen_direct():
         )
         
         output_path = output_dir / f"prompt_{name}.wav"
-        track.export(str(output_path))
+        pending_exports.append(track.export_async(str(output_path)))
         print(f"   ✅ Saved {output_path.name}")
     
     # Test temperature variations
@@ -96,29 +116,33 @@ def test_musicgen_direct():
     
     temp_tests = [0.8, 1.0, 1.2]
     
-    for temp in temp_tests:
+    # Create a custom generation with temperature
+    prompt = "uplifting electronic dance music, energetic and positive, 128 BPM"
+    
+    # One batched generation with a per-sample temperature instead of one call per setting
+    print(f"\n   Generating temperatures {temp_tests} in one batch...")
+    inputs = engine.processor(text=[prompt], padding=True, return_tensors="pt").to(engine.device)  # Tokenized once, reused for every row
+    
+    temperature_processor = PerSampleTemperature(
+        temp_tests,
+        num_codebooks=engine.model.decoder.config.num_codebooks
+    )
+    
+    with torch.inference_mode():
+        audio_values = engine.model.generate(
+            input_ids=inputs.input_ids.repeat(len(temp_tests), 1),
+            attention_mask=inputs.attention_mask.repeat(len(temp_tests), 1),
+            max_new_tokens=engine.tokens_for_duration(4.0),
+            do_sample=True,
+            guidance_scale=2.5,
+            temperature=1.0,  # Per-sample temperatures applied by the processor
+            logits_processor=LogitsProcessorList([temperature_processor])
+        )
+    
+    # One int16 device-to-host copy for the whole batch
+    for temp, audio in zip(temp_tests, _to_pcm16(audio_values)):
         print(f"\n   Testing temperature={temp}")
         
-        # Create a custom generation with temperature
-        prompt = "uplifting electronic dance music, energetic and positive, 128 BPM"
-        
-        inputs = engine.processor(
-            text=[prompt],
-            padding=True,
-            return_tensors="pt"
-        ).to(engine.device)
-        
-        with torch.no_grad():
-            audio_values = engine.model.generate(
-                **inputs,
-                max_new_tokens=256,  # 4 seconds
-                do_sample=True,
-                guidance_scale=2.5,
-                temperature=temp
-            )
-        
-        audio = audio_values[0].cpu()
-        
         track = AudioTrack(
             data=audio,
             sample_rate=engine.sample_rate,
@@ -127,9 +151,13 @@ def test_musicgen_direct():
         )
         
         output_path = output_dir / f"temperature_{temp}.wav"
-        track.export(str(output_path))
+        pending_exports.append(track.export_async(str(output_path)))
         print(f"   ✅ Saved {output_path.name}")
     
+    # Make sure every background export finished (and surface any errors)
+    for future in pending_exports:
+        future.result()
+    
     print(f"\n✅ All tests complete! Check {output_dir.absolute()}/")
     print("\nListen to the files and see which settings produce better quality.")
     print("\nKey insights:")
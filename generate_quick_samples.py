@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 """Generate quick sample tracks for repository showcase."""
 
-import json
 from pathlib import Path
 from datetime import datetime
-from resonantgen.core.musicgen_engine import MusicGenEngine
+from resonantgen import get_workstation
 from resonantgen.core.track_session import AudioTrack
+from resonantgen.utils import write_json
 
 def generate_quick_samples():
     """Generate a few quick sample tracks using MusicGenEngine directly."""
@@ -19,7 +19,7 @@ def generate_quick_samples():
     
     # Initialize engine
     print("\n1. Loading MusicGen engine...")
-    engine = MusicGenEngine(model_size="small")
+    engine = get_workstation("small").engine
     print("✅ Engine ready")
     
     # Quick sample prompts (shorter generation time)
@@ -74,8 +74,7 @@ def generate_quick_samples():
             "model": "MusicGen Small (optimized parameters)"
         }
         
-        with open(samples_dir / f"{sample['name']}_info.json", "w") as f:
-            json.dump(metadata, f, indent=2)
+        write_json(samples_dir / f"{sample['name']}_info.json", metadata)
     
     # Create samples README
     readme_content = f"""# ResonantGen Audio Samples
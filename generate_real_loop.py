@@ -3,7 +3,7 @@
 
 import os
 from pathlib import Path
-from resonantgen import MusicWorkstation
+from resonantgen import get_workstation
 
 def main():
     print("🎵 ResonantGen - Generating Real Audio Loop")
@@ -17,7 +17,7 @@ def main():
     
     # Initialize MusicWorkstation with small model for faster generation
     print("\n1. Initializing MusicWorkstation...")
-    maw = MusicWorkstation(model_size="small")
+    maw = get_workstation("small")
     print("✅ MusicWorkstation ready")
     
     # Generate a chill lo-fi beat
@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """Generate sample tracks for repository showcase."""
 
-import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from resonantgen import MusicWorkstation
+from resonantgen import get_workstation
+from resonantgen.utils import write_json
 
 def generate_showcase_samples():
     """Generate diverse sample tracks to showcase ResonantGen capabilities."""
@@ -18,7 +19,7 @@ def generate_showcase_samples():
     
     # Initialize workstation
     print("\n1. Initializing MusicWorkstation...")
-    maw = MusicWorkstation(model_size="small")
+    maw = get_workstation("small")
     print("✅ MusicWorkstation ready")
     
     # Define sample tracks to generate
@@ -52,12 +53,18 @@ def generate_showcase_samples():
     
     # Generate each sample
     sample_info = []
+    pending_exports = []  # WAV/JSON writes overlap with the next generation
+    metadata_writer = ThreadPoolExecutor(max_workers=1)
     
     for i, track_info in enumerate(sample_tracks, 1):
         print(f"\n{i}. Generating: {track_info['name']}")
         print(f"   Prompt: {track_info['prompt']}")
         print("   🎼 Creating multi-track session...")
         
+        # Encode the next sample's prompts while this one decodes
+        if i < len(sample_tracks):
+            maw.prefetch(sample_tracks[i]['prompt'])
+        
         # Generate session
         session = maw.generate(track_info['prompt'])
         
@@ -65,16 +72,16 @@ def generate_showcase_samples():
         track_dir = samples_dir / track_info['name']
         track_dir.mkdir(exist_ok=True)
         
-        # Save individual stems
+        # Save individual stems in the background
         print("   💾 Saving individual stems...")
         for track_name, track in session.tracks.items():
             stem_path = track_dir / f"{track_name}.wav"
-            track.export(str(stem_path))
+            pending_exports.append(track.export_async(str(stem_path)))
             print(f"      ✅ {track_name}.wav ({track.duration:.1f}s)")
         
         # Save mixed version
         mixed_path = track_dir / "mixed.wav"
-        session.export(mixed_path, stems=False)
+        pending_exports.append(session.export_async(mixed_path, stems=False))
         print(f"   🎵 Saved mixed.wav ({session.duration:.1f}s)")
         
         # Save metadata
@@ -97,12 +104,16 @@ def generate_showcase_samples():
             }
         }
         
-        with open(track_dir / "info.json", "w") as f:
-            json.dump(metadata, f, indent=2)
+        pending_exports.append(metadata_writer.submit(write_json, track_dir / "info.json", metadata))
         
         sample_info.append(metadata)
         print(f"   📋 Saved metadata")
     
+    # Make sure every background export finished (and surface any errors)
+    for future in pending_exports:
+        future.result()
+    metadata_writer.shutdown()
+    
     # Create samples index
     index_data = {
         "title": "ResonantGen Sample Tracks",
@@ -112,8 +123,7 @@ def generate_showcase_samples():
         "samples": sample_info
     }
     
-    with open(samples_dir / "index.json", "w") as f:
-        json.dump(index_data, f, indent=2)
+    write_json(samples_dir / "index.json", index_data)
     
     # Create README for samples
     readme_content = f"""# ResonantGen Sample Tracks
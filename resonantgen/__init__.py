@@ -8,12 +8,21 @@ and scene-based performance control.
 __version__ = "0.1.0"
 __author__ = "ResonantGen Team"
 
-from .core.workstation import MusicWorkstation
+import os
+
+# OpenMP reads these when torch first loads, so set them before importing it:
+# keep each worker thread on a core near its parent and split loops statically.
+# Existing values win (e.g. GOMP_CPU_AFFINITY / OMP_PROC_BIND set by the user).
+os.environ.setdefault("OMP_PROC_BIND", "CLOSE")
+os.environ.setdefault("OMP_SCHEDULE", "STATIC")
+
+from .core.workstation import MusicWorkstation, get_workstation
 from .core.track_session import TrackSession, AudioTrack
 from .core.prompt_processor import PromptProcessor
 
 __all__ = [
     "MusicWorkstation",
+    "get_workstation",
     "TrackSession", 
     "AudioTrack",
     "PromptProcessor",
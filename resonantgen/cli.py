@@ -9,9 +9,14 @@ Jordan's workflow in under 60 seconds:
 4. export session_01
 """
 
+import argparse
 import sys
 import os
+import queue
+import random
+import threading
 import time
+from concurrent.futures import Future
 from pathlib import Path
 from typing import Optional, Dict
 
@@ -22,37 +27,97 @@ from .core.track_session import TrackSession
 class ResonantCLI:
     """Phase 0 CLI Interface - The minimum viable telepathy."""
     
-    def __init__(self):
+    def __init__(self, compile: bool = True, use_cache: bool = True, seed: Optional[int] = None):
+        """
+        Args:
+            compile: Compile and warm up the decoder at startup (CUDA only)
+            use_cache: Serve repeated generations from ~/.cache/resonantgen
+            seed: Base seed to replay an earlier run's generations (default:
+                random, so every run sounds new)
+        """
         self.workstation: Optional[MusicWorkstation] = None
         self.session: Optional[TrackSession] = None
         self.session_counter = 1
         self.start_time = time.time()
         
+        # Every generation gets the next seed after a per-run base: each run
+        # (and each regenerate) sounds new, while rerunning with the printed
+        # base seed replays a workflow, from the cache when it's on
+        self.base_seed = seed if seed is not None else random.SystemRandom().randrange(2**31)
+        self.generation_count = 0
+        
+        # One worker thread loads the model (and runs the compile warmup) in
+        # the background while the banner prints and the user types their
+        # first prompt, then runs every generation: CUDA graphs recorded
+        # during warmup can only be replayed on the thread that recorded them
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._work,
+            name="resonantgen-generate",
+            daemon=True
+        )
+        self._worker.start()
+        self._load_future = self._submit(self._load_workstation, compile, use_cache)
+        
         print("\n🎵 ResonantGen - Musical Telepathy Phase 0")
         print("   Thought → Sound in under 60 seconds\n")
-        
-        # Initialize workstation
         print("Initializing musical consciousness...")
-        self.workstation = MusicWorkstation(model_size="small")
+        print(f"   (seed {self.base_seed}: pass --seed {self.base_seed} to replay this run)")
+    
+    def _work(self):
+        """Run queued jobs in order (the worker thread's loop)."""
+        while True:
+            future, fn, args, kwargs = self._jobs.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+    
+    def _submit(self, fn, *args, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs) on the worker thread."""
+        future: Future = Future()
+        self._jobs.put((future, fn, args, kwargs))
+        return future
+    
+    def _load_workstation(self, compile: bool, use_cache: bool) -> MusicWorkstation:
+        """Create the workstation (runs on the worker thread)."""
+        self.workstation = MusicWorkstation(model_size="small", use_cache=use_cache, compile=compile)
         print("✅ Ready for telepathy\n")
         
+        # The 60-second clock starts once the model is ready
+        self.start_time = time.time()
+        return self.workstation
+    
+    def _wait_for_workstation(self) -> MusicWorkstation:
+        """Block until the background model load finishes."""
+        if not self._load_future.done():
+            print("   (waiting for the model to finish loading...)")
+        try:
+            return self._load_future.result()
+        except BaseException as e:
+            raise RuntimeError(f"Model failed to load: {e}") from e
+    
+    def _run(self, fn, *args, **kwargs):
+        """Run a generation on the worker thread and wait for its result."""
+        return self._submit(fn, *args, **kwargs).result()
+        
     def prompt(self, description: str):
         """Generate music from natural language."""
         print(f"🧠 Processing: '{description}'")
         print("   Translating thought to sound...\n")
         
-        # Generate tracks
-        self.session = self.workstation.generate(description, duration=8.0)
-        
-        # Save to session folder
+        # Generate tracks, streaming each one to the session folder as it decodes
         session_name = f"session_{self.session_counter:02d}"
         session_path = Path("loops") / session_name
-        session_path.mkdir(parents=True, exist_ok=True)
-        
-        # Export individual tracks
-        for track_name, track in self.session.tracks.items():
-            track_path = session_path / f"{track_name}.wav"
-            track.export(str(track_path))
+        self.session = self._run(
+            self._wait_for_workstation().generate,
+            description, 
+            duration=8.0, 
+            seed=self._next_seed(), 
+            stream_to=str(session_path)
+        )
         
         print(f"\n✅ Generated loop saved to /loops/{session_name}/")
         print("   📁 drums.wav, bass.wav, harmony.wav, melody.wav")
@@ -61,6 +126,11 @@ class ResonantCLI:
         elapsed = time.time() - self.start_time
         print(f"   ⏱️  {elapsed:.1f} seconds elapsed\n")
         
+    def _next_seed(self) -> int:
+        """Seed for the next generation."""
+        self.generation_count += 1
+        return self.base_seed + self.generation_count
+    
     def lock(self, track_name: str):
         """Lock a track to preserve it during regeneration."""
         if not self.session:
@@ -102,7 +172,12 @@ class ResonantCLI:
         regen_prompt = description or f"different {track_name} pattern"
         
         print(f"🔄 Regenerating {track_name}...")
-        new_track = self.workstation.regenerate(track_name, regen_prompt)
+        new_track = self._run(
+            self._wait_for_workstation().regenerate,
+            track_name, 
+            regen_prompt, 
+            seed=self._next_seed()
+        )
         
         # Update session folder
         session_name = f"session_{self.session_counter:02d}"
@@ -240,7 +315,26 @@ class ResonantCLI:
 
 def main():
     """Entry point for the CLI."""
-    cli = ResonantCLI()
+    parser = argparse.ArgumentParser(description="ResonantGen Phase 0 CLI")
+    parser.add_argument(
+        "--no-compile",
+        action="store_true",
+        help="skip compiling the decoder at startup (faster start, slower generation)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always generate fresh audio instead of reusing cached results"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="base seed to replay an earlier run (default: random)"
+    )
+    args = parser.parse_args()
+    
+    cli = ResonantCLI(compile=not args.no_compile, use_cache=not args.no_cache, seed=args.seed)
     cli.run()
 
 
@@ -4,15 +4,21 @@ ResonantGen Core Components
 Contains the core music generation and track management systems.
 """
 
-from .workstation import MusicWorkstation
+from .workstation import MusicWorkstation, get_workstation
 from .track_session import TrackSession, AudioTrack
 from .musicgen_engine import MusicGenEngine
+from .audio_cache import AudioCache
 from .prompt_processor import PromptProcessor
+from .streaming import AudioStreamer, WavStreamWriter
 
 __all__ = [
     "MusicWorkstation",
+    "get_workstation",
     "TrackSession",
     "AudioTrack", 
     "MusicGenEngine",
+    "AudioCache",
     "PromptProcessor",
+    "AudioStreamer",
+    "WavStreamWriter",
 ]
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Mixing kernels for TrackSession export
+
+Mixes stacked stems into a single track. When numba is installed
+(`pip install resonantgen[performance]`) CPU mixes run through a parallel
+JIT-compiled kernel that makes one pass over the stems without temporaries;
+otherwise (or for GPU tensors) torch does the reduction.
+"""
+
+import importlib.util
+import typing as tp
+
+import torch
+
+# Optional dependency. The kernel module is imported on first use: importing
+# numba (and loading its JIT) adds noticeably to `import resonantgen`, and
+# most sessions never export a mix
+_HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+
+def mix_stems(stems: torch.Tensor, weights: tp.Optional[torch.Tensor] = None) -> torch.Tensor:
+    """
+    Mix stacked stems into one track.
+
+    Args:
+        stems: Audio tensor [stems, channels, samples], float32 or int16 (int16
+            is read as is; fold its scale into weights)
+        weights: Per-stem gain [stems] (default: equal weights averaging the stems)
+
+    Returns:
+        Mixed audio tensor [channels, samples]
+    """
+    n_stems = stems.shape[0]
+    if weights is None:
+        weights = torch.full((n_stems,), 1.0 / n_stems)
+
+    # The kernel reads int16 stems directly, with no float copy of the stack
+    if _HAS_NUMBA and stems.device.type == "cpu" and stems.dtype in (torch.float32, torch.int16):
+        from ._mix_numba import mix_kernel
+        mixed = mix_kernel(
+            stems.contiguous().numpy(),
+            weights.to(torch.float32).numpy()
+        )
+        return torch.from_numpy(mixed)
+
+    if not stems.is_floating_point():
+        stems = stems.to(torch.float32)
+    return torch.tensordot(weights.to(stems.device, stems.dtype), stems, dims=1)
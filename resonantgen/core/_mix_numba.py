@@ -0,0 +1,20 @@
+"""
+Numba mixing kernel (imported by _mix on first use; needs numba)
+"""
+
+import numba
+import numpy as np
+
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def mix_kernel(stems: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Weighted sum over the stem axis of a [stems, channels, samples] array."""
+    n_stems, n_channels, n_samples = stems.shape
+    out = np.empty((n_channels, n_samples), dtype=np.float32)
+    for s in numba.prange(n_samples):
+        for c in range(n_channels):
+            acc = np.float32(0.0)
+            for i in range(n_stems):
+                acc += weights[i] * stems[i, c, s]
+            out[c, s] = acc
+    return out
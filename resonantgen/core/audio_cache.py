@@ -0,0 +1,83 @@
+"""
+Audio Cache - Persistent prompt→audio cache for MusicGen generations
+
+Every MusicGen call costs seconds of GPU time. Requests that are identical
+(same prompt, duration, sampling parameters and model) are served from disk
+instead, which makes re-running driver scripts near-instant.
+"""
+
+import hashlib
+import json
+import typing as tp
+from pathlib import Path
+
+import torch
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "resonantgen"
+
+
+class AudioCache:
+    """
+    On-disk cache of generated audio keyed by a hash of the generation request.
+
+    Entries are stored as `<sha256>.pt` tensors in the cache directory.
+    """
+
+    def __init__(self, cache_dir: tp.Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cache entries (default: ~/.cache/resonantgen)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(prompt: str, duration: float, **params) -> str:
+        """
+        Build a cache key for a generation request.
+
+        Args:
+            prompt: Text prompt
+            duration: Requested duration in seconds
+            **params: Everything else that affects the output (sampling params,
+                seed, model and weights revision)
+
+        Returns:
+            Hex SHA-256 digest identifying the request
+        """
+        payload = json.dumps(
+            {"prompt": prompt, "duration": duration, **params},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pt"
+
+    def get(self, key: str) -> tp.Optional[torch.Tensor]:
+        """Return cached audio for key, or None on a miss."""
+        path = self._path(key)
+        if not path.exists():
+            return None
+
+        try:
+            return torch.load(path)
+        except (OSError, RuntimeError, EOFError):
+            # Truncated or corrupted entry - treat as a miss and regenerate
+            return None
+
+    def put(self, key: str, audio: torch.Tensor):
+        """Store audio under key."""
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        torch.save(audio.cpu(), tmp_path)
+        tmp_path.replace(path)  # Atomic, so readers never see a partial file
+
+    def clear(self):
+        """Remove all cache entries."""
+        for path in self.cache_dir.glob("*.pt"):
+            path.unlink()
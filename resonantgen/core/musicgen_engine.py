@@ -5,9 +5,39 @@ Provides a clean interface to MusicGen's generation capabilities
 optimized for multi-track generation.
 """
 
+import contextlib
+import copy
+import importlib.util
+import math
+import os
+import threading
 import torch
 import typing as tp
-from transformers import MusicgenForConditionalGeneration, AutoProcessor
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from transformers import MusicgenForConditionalGeneration, AutoProcessor, GenerationConfig
+from transformers.modeling_outputs import BaseModelOutput
+
+from .audio_cache import AudioCache
+from .prompt_processor import PromptProcessor
+from .streaming import AudioSink, AudioStreamer
+
+
+PRECISION_DTYPES = {
+    "fp32": torch.float32,
+    "fp16": torch.float16,
+    "bf16": torch.bfloat16,
+}
+
+# Longest clip in seconds (MusicGen is trained on 30 s of audio)
+MAX_DURATION = 30.0
+
+# With a compiled decoder, prompt batches are padded to a multiple of this many
+# tokens so the cross-attention shapes (and captured graphs) repeat across prompts
+PROMPT_LENGTH_BUCKET = 16
+
+# Request whose track prompts warm up the compiled decoder
+WARMUP_PROMPT = "chill lo-fi hip-hop beat at 72 BPM with jazzy chords"
 
 
 class MusicGenEngine:
@@ -18,114 +48,742 @@ class MusicGenEngine:
     for our track-specific generation needs.
     """
     
-    def __init__(self, model_size: str = "small", device: torch.device = None):
+    # Runtime the decoder loop runs in (subclasses override)
+    backend = "torch"
+    
+    def __init__(self, 
+                 model_size: str = "small", 
+                 device: torch.device = None,
+                 half_precision: bool = True,
+                 compile_decoder: bool = False,
+                 use_cache: bool = False,
+                 cache_dir: tp.Optional[str] = None,
+                 quantize: tp.Optional[str] = None,
+                 precision: tp.Optional[str] = None):
         """
         Initialize the MusicGen engine.
         
         Args:
             model_size: Size of model ("small", "medium", "large") 
             device: Torch device to run on
+            half_precision: Load weights in FP16 and autocast generation on CUDA
+            compile_decoder: Capture the decoder step as CUDA graphs (CUDA only,
+                adds warmup time at load)
+            use_cache: Serve repeated identical requests from the on-disk audio cache
+            cache_dir: Cache directory (default: ~/.cache/resonantgen)
+            quantize: Weight quantization for the decoder (None or "int8"; needs torchao)
+            precision: "fp16", "bf16" or "fp32"; overrides half_precision. BF16
+                suits Ampere+ GPUs and AMX CPUs
         """
         self.model_size = model_size
         self.device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
+        self.precision = self._resolve_precision(precision, half_precision)
+        self.dtype = PRECISION_DTYPES[self.precision]
+        self.half_precision = self.precision != "fp32"
+        
+        if self.device.type == "cuda":
+            # Route remaining FP32 matmuls/convolutions through TF32 tensor cores
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            torch.set_float32_matmul_precision("high")
+        else:
+            self._configure_cpu_threads()
+        
         # Load model and processor
         model_name = f"facebook/musicgen-{model_size}"
         print(f"Loading MusicGen {model_size} model...")
         
         self.processor = AutoProcessor.from_pretrained(model_name)
-        self.model = MusicgenForConditionalGeneration.from_pretrained(model_name)
-        self.model.to(self.device)
+        self.model, self.attn_implementation = self._load_model(model_name)
+        self.model.to(self.device)  # No-op when loaded with a device_map
+        self.model.eval()  # Inference only - set once at load
+        # Decoding re-runs the whole sequence every step without the KV cache;
+        # make sure no checkpoint config turns it off
+        self.model.generation_config.use_cache = True
+        
+        # Hub commit of the loaded weights, so cached audio from older weights isn't reused
+        self.model_revision = getattr(self.model.config, "_commit_hash", None)
+        
+        self.quantize = self._quantize_decoder(quantize) if quantize else None
         
         # Set generation parameters
         self.sample_rate = self.model.config.audio_encoder.sampling_rate
-        self.max_new_tokens = 512  # ~8 seconds of audio
+        self.frame_rate = self.model.config.audio_encoder.frame_rate  # Tokens per second (50 Hz for EnCodec 32 kHz)
+        self.max_new_tokens = 512  # ~10 seconds of audio
+        self.generation_params = {
+            "do_sample": True,
+            "guidance_scale": 1.5,  # Lower = more natural, less "evil" sound
+            "temperature": 1.2,     # Slightly higher for musical variety
+            "top_k": 250,           # Limit choices for coherence
+            "top_p": 0.95,          # Nucleus sampling for better quality
+        }
+        
+        # Sampling params -> GenerationConfig passed to generate(); the model's own
+        # generation_config is never mutated, so compiled graphs stay valid
+        self._generation_configs: tp.Dict[tp.Tuple, GenerationConfig] = {}
+        
+        # Sampling makes every call different, so caching is opt-in: with it on,
+        # identical requests return identical audio
+        self.cache = AudioCache(cache_dir) if use_cache else None
+        
+        # prompt -> (token ids, T5 hidden states) on CPU, least recently used first
+        self._text_cache: "OrderedDict[str, tp.Tuple[torch.Tensor, torch.Tensor]]" = OrderedDict()
+        self.text_cache_size = 128
+        self._text_cache_lock = threading.Lock()
+        self._text_cache_hits = 0
+        self._text_cache_misses = 0
+        
+        # Background text encoding (see prefetch()); on CUDA it gets its own stream
+        # so the encoder kernels don't queue behind the decoder's
+        self._pending_encodes: tp.Dict[str, Future] = {}
+        self._prefetch_executor: tp.Optional[ThreadPoolExecutor] = None
+        self._prefetch_stream = torch.cuda.Stream(device=self.device) if self.device.type == "cuda" else None
+        
+        # Streams (and host threads driving them) for generate_multi()
+        self.num_streams = 4
+        self._streams: tp.List[torch.cuda.Stream] = []
+        self._stream_executor: tp.Optional[ThreadPoolExecutor] = None
+        
+        # Only the torch decoder allocates its KV cache from torch's caching allocator
+        if self.device.type == "cuda" and self.backend == "torch":
+            self.reserve_memory()
+        
+        self.compile_decoder = compile_decoder and self.device.type == "cuda"
+        if self.compile_decoder:
+            # "reduce-overhead" records the decoder forward as CUDA graphs, so each
+            # autoregressive step replays one graph instead of launching every kernel
+            self.model.decoder.forward = torch.compile(
+                self.model.decoder.forward,
+                mode="reduce-overhead",
+                fullgraph=False
+            )
+            self.warmup()
         
         print(f"✅ MusicGen {model_size} loaded on {self.device}")
         print(f"   Sample rate: {self.sample_rate}Hz")
     
-    def generate(self, prompt: str, duration: float = 8.0) -> torch.Tensor:
+    def _resolve_precision(self, precision: tp.Optional[str], half_precision: bool) -> str:
+        """Pick the weight/autocast precision this device can run."""
+        if precision is None:
+            # Half precision only pays off on tensor-core GPUs; CPU stays in FP32
+            return "fp16" if half_precision and self.device.type == "cuda" else "fp32"
+        
+        if precision not in PRECISION_DTYPES:
+            raise ValueError(f"Unknown precision '{precision}'. Available: {list(PRECISION_DTYPES)}")
+        
+        if precision == "fp16" and self.device.type != "cuda":
+            print("⚠️  FP16 is GPU-only, using FP32 on CPU")
+            return "fp32"
+        if precision == "bf16" and self.device.type == "cuda" and not torch.cuda.is_bf16_supported():
+            print("⚠️  This GPU has no BF16 support, using FP16")
+            return "fp16"
+        return precision
+    
+    @staticmethod
+    def _configure_cpu_threads():
         """
-        Generate audio from text prompt.
+        Size torch's thread pools for CPU inference.
+        
+        One intra-op thread per physical core (assumed to be half the logical
+        CPUs with SMT) avoids hyperthreads fighting over the same FPUs; two
+        inter-op threads are plenty since generation is one sequential loop.
+        An explicit OMP_NUM_THREADS is respected.
+        """
+        if "OMP_NUM_THREADS" not in os.environ:
+            torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+        try:
+            torch.set_num_interop_threads(2)
+        except RuntimeError:
+            pass  # Can only be set before the first parallel op in the process
+    
+    def _load_model(self, model_name: str) -> tp.Tuple[MusicgenForConditionalGeneration, str]:
+        """
+        Load MusicGen with the fastest attention kernel available.
+        
+        FlashAttention-2 (fused, IO-aware attention) needs CUDA, half precision
+        and the flash-attn package; otherwise PyTorch's SDPA kernels are used,
+        with the eager implementation as a last resort for old transformers.
         
         Args:
-            prompt: Text description of the music to generate
+            model_name: Hugging Face model id
+            
+        Returns:
+            (model, attention implementation used)
+        """
+        candidates = ["sdpa", "eager"]
+        if self.half_precision and importlib.util.find_spec("flash_attn") is not None:
+            candidates.insert(0, "flash_attention_2")
+        
+        # Memory-map the safetensors checkpoint and materialize weights straight
+        # in the target dtype (and, with accelerate, on the target device) instead
+        # of building a full FP32 copy on CPU first
+        load_kwargs: tp.Dict[str, tp.Any] = {"low_cpu_mem_usage": True}
+        if importlib.util.find_spec("accelerate") is not None:
+            load_kwargs["device_map"] = {"": self.device}
+        
+        for attn_implementation in candidates:
+            try:
+                model = MusicgenForConditionalGeneration.from_pretrained(
+                    model_name,
+                    torch_dtype=self.dtype,
+                    attn_implementation=attn_implementation,
+                    **load_kwargs
+                )
+                return model, attn_implementation
+            except (ValueError, ImportError, TypeError) as e:
+                if attn_implementation == candidates[-1]:
+                    raise
+                print(f"   {attn_implementation} attention unavailable ({e}), falling back")
+    
+    def _quantize_decoder(self, quantize: str) -> tp.Optional[str]:
+        """
+        Quantize the decoder's linear layers in place.
+        
+        Decoding is bound by reading weights, so INT8 weights (dequantized inside
+        the matmul) roughly halve that traffic versus FP16. The text encoder and
+        EnCodec run once per generation and stay in full precision.
+        
+        Args:
+            quantize: Quantization scheme ("int8")
+            
+        Returns:
+            The applied scheme, or None if quantization was unavailable
+        """
+        if quantize != "int8":
+            raise ValueError(f"Unknown quantization '{quantize}'. Available: ['int8']")
+        
+        try:
+            from torchao.quantization import quantize_
+            try:
+                from torchao.quantization import Int8WeightOnlyConfig as int8_config
+            except ImportError:  # torchao < 0.9
+                from torchao.quantization import int8_weight_only as int8_config
+        except ImportError:
+            print("⚠️  torchao not installed - running unquantized (pip install resonantgen[performance])")
+            return None
+        
+        quantize_(self.model.decoder, int8_config())
+        print("   Decoder weights quantized to INT8")
+        return quantize
+    
+    def reserve_memory(self, batch_size: int = 4, duration: float = 8.0):
+        """
+        Pre-grow the CUDA caching allocator to fit a generation's KV cache.
+        
+        MusicGen's KV cache grows by concatenation every decoding step, so the
+        first generations at a new size stall on cudaMalloc and fragment the
+        pool. Allocating the peak once up front (and freeing it back to the
+        cache) lets later generations carve their buffers from a segment that
+        is already mapped.
+        
+        Args:
+            batch_size: Prompts per generation to plan for (4 = one per stem)
+            duration: Duration in seconds to plan for
+        """
+        config = self.model.decoder.config
+        tokens = self.tokens_for_duration(duration)
+        rows = 2 * batch_size  # Classifier-free guidance doubles the batch
+        
+        # Keys + values for every layer; concatenation briefly holds old and new
+        kv_bytes = 2 * config.num_hidden_layers * rows * config.hidden_size * tokens * (torch.finfo(self.dtype).bits // 8)
+        reserve = torch.empty(2 * kv_bytes, dtype=torch.uint8, device=self.device)
+        del reserve  # Returned to the caching allocator, not to the driver
+    
+    def warmup(self, 
+               duration: float = 8.0, 
+               iterations: int = 2, 
+               prompt_batches: tp.Optional[tp.Sequence[tp.Sequence[str]]] = None):
+        """
+        Run throwaway generations so compiled graphs are captured before real use.
+        
+        Graphs are shape-specific: one set per batch size and prompt length
+        bucket (see PROMPT_LENGTH_BUCKET). Each distinct shape among
+        prompt_batches is generated once per iteration. Graphs are recorded on
+        the calling thread and can only be replayed there, so call this from
+        the thread that will generate.
+        
+        Args:
+            duration: Duration to warm up for (should match typical requests;
+                every step's KV cache length is its own graph)
+            iterations: Generations per shape (the first compiles, the second
+                records the graphs)
+            prompt_batches: Representative batches to capture (default: the
+                workstation's track prompts for WARMUP_PROMPT, all four at once
+                as generate() sends them, and one track at a time as
+                regenerate() does)
+        """
+        if prompt_batches is None:
+            prompt_batches = self._default_warmup_batches()
+        
+        shapes = {}
+        for batch in prompt_batches:
+            length = max(len(ids) for ids in self.processor.tokenizer(list(batch)).input_ids)
+            bucket = -(-length // PROMPT_LENGTH_BUCKET)
+            shapes.setdefault((len(batch), bucket), list(batch))
+        
+        print(f"   Warming up decoder ({len(shapes)} shapes)...")
+        for batch in shapes.values():
+            for _ in range(iterations):
+                self._generate(batch, duration)
+    
+    @staticmethod
+    def _default_warmup_batches() -> tp.List[tp.List[str]]:
+        """Prompt batches shaped like the workstation's generate() and regenerate() calls."""
+        processor = PromptProcessor()
+        context = processor.analyze(WARMUP_PROMPT)
+        track_prompts = processor.create_track_prompts(context)
+        
+        batches = [list(track_prompts.values())]
+        for track_name in track_prompts:
+            for locked_context in ({}, {"locked_track_names": ["bass"]}):
+                batches.append([processor.create_regeneration_prompt(
+                    track_name, f"different {track_name} pattern", locked_context, context
+                )])
+        return batches
+    
+    def _autocast(self):
+        """Autocast context for generation (no-op unless running in half precision)."""
+        return torch.autocast(
+            device_type=self.device.type,
+            dtype=self.dtype if self.half_precision else torch.float16,
+            enabled=self.half_precision
+        )
+    
+    def _generation_params(self, gen_kwargs: tp.Dict[str, tp.Any]) -> tp.Dict[str, tp.Any]:
+        """Engine defaults with per-call overrides applied."""
+        return {**self.generation_params, **gen_kwargs}
+    
+    def _generation_config(self, params: tp.Dict[str, tp.Any]) -> GenerationConfig:
+        """
+        GenerationConfig for a set of sampling params, built once per distinct set.
+        
+        Args:
+            params: Sampling params (see generation_params)
+            
+        Returns:
+            Copy of the model's generation config updated with params
+        """
+        key = tuple(sorted(params.items()))
+        if key not in self._generation_configs:
+            config = copy.deepcopy(self.model.generation_config)
+            config.update(**params)
+            self._generation_configs[key] = config
+        return self._generation_configs[key]
+    
+    def _generate(self, 
+                  prompts: tp.List[str], 
+                  duration: float, 
+                  streamer: tp.Optional[AudioStreamer] = None, 
+                  **gen_kwargs) -> torch.Tensor:
+        """
+        Run MusicGen on a batch of prompts, bypassing the cache.
+        
+        Args:
+            prompts: List of text prompts
             duration: Duration in seconds (approximate)
+            streamer: Optional AudioStreamer fed each generated step
+            **gen_kwargs: Per-call overrides of generation_params
             
         Returns:
-            Audio tensor [1, samples] at model's sample rate
+            Audio tensor [batch, 1, samples] on CPU in FP32
         """
-        # Calculate tokens needed for duration
-        # Rough estimate: ~32 tokens per second
-        tokens_needed = int(duration * 32)
-        tokens_needed = min(tokens_needed, 1024)  # Cap at model limit
+        tokens_needed = self.tokens_for_duration(duration)
         
-        # Process prompt
-        inputs = self.processor(
-            text=[prompt],
-            padding=True,
-            return_tensors="pt"
-        ).to(self.device)
+        seed = gen_kwargs.pop("seed", None)
+        if seed is not None:
+            torch.manual_seed(seed)  # Seeds the CPU and every CUDA device
         
-        # Generate with no_grad for efficiency
-        with torch.no_grad():
+        generation_config = self._generation_config(self._generation_params(gen_kwargs))
+        guidance_scale = generation_config.guidance_scale
+        
+        # inference_mode also skips the view and version-counter tracking no_grad still does
+        with torch.inference_mode(), self._autocast():
+            input_ids, attention_mask, encoder_hidden_states = self._encode_text(prompts)
+            
+            # MusicGen appends a null (all-zero) condition for classifier-free guidance
+            # when it runs the text encoder itself; do the same for cached encodings
+            if guidance_scale is not None and guidance_scale > 1:
+                encoder_hidden_states = torch.cat(
+                    [encoder_hidden_states, torch.zeros_like(encoder_hidden_states)], dim=0
+                )
+                attention_mask = torch.cat(
+                    [attention_mask, torch.zeros_like(attention_mask)], dim=0
+                )
+            
             audio_values = self.model.generate(
-                **inputs,
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                encoder_outputs=BaseModelOutput(last_hidden_state=encoder_hidden_states),
+                generation_config=generation_config,
                 max_new_tokens=tokens_needed,
-                do_sample=True,
-                guidance_scale=1.5,  # Lower = more natural, less "evil" sound
-                temperature=1.2,     # Slightly higher for musical variety
-                top_k=250,          # Limit choices for coherence
-                top_p=0.95          # Nucleus sampling for better quality
+                streamer=streamer
             )
         
-        # Return single audio tensor
-        return audio_values[0].cpu()  # [1, samples]
+        # FP32 so downstream mixing/export is unchanged
+        return self._to_host(audio_values.float())
     
-    def generate_batch(self, prompts: tp.List[str], duration: float = 8.0) -> tp.List[torch.Tensor]:
+    def tokens_for_duration(self, duration: float) -> int:
         """
-        Generate multiple tracks in parallel for efficiency.
+        Decoder steps needed for `duration` seconds of audio.
+        
+        One step per EnCodec frame, plus num_codebooks - 1 steps that the
+        codebook delay pattern leaves incomplete. Capped at MusicGen's 30 s
+        training length.
+        """
+        frames = math.ceil(min(duration, MAX_DURATION) * self.frame_rate)
+        return frames + self.model.decoder.config.num_codebooks - 1
+    
+    def _to_host(self, audio: torch.Tensor) -> torch.Tensor:
+        """
+        Copy generated audio to the CPU.
+        
+        On CUDA the copy goes through pinned memory as an async DMA, and only
+        the current stream is waited on, so decodes running on other streams
+        (generate_multi(), prefetch()) keep going while it completes.
+        """
+        if audio.device.type != "cuda":
+            return audio.cpu()
+        
+        host = torch.empty(audio.shape, dtype=audio.dtype, pin_memory=True)
+        host.copy_(audio, non_blocking=True)
+        copied = torch.cuda.Event()
+        copied.record()
+        copied.synchronize()
+        return host
+    
+    def _encode_text(self, prompts: tp.List[str]) -> tp.Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Tokenize and T5-encode prompts, reusing cached encodings.
+        
+        Each prompt's token ids and encoder hidden states are cached, so repeated
+        prompts (e.g. across regenerations) skip the text encoder entirely.
         
         Args:
             prompts: List of text prompts
-            duration: Duration for each track
             
         Returns:
-            List of audio tensors
+            (input_ids, attention_mask, encoder_hidden_states) padded to the
+            longest prompt, on the engine's device
         """
-        tokens_needed = int(duration * 32)
-        tokens_needed = min(tokens_needed, 1024)
+        # Wait for any of these prompts still being encoded by prefetch()
+        for prompt in prompts:
+            future = self._pending_encodes.pop(prompt, None)
+            if future is not None:
+                future.result()
+        
+        with self._text_cache_lock:
+            missing = [prompt for prompt in dict.fromkeys(prompts) if prompt not in self._text_cache]
+            self._text_cache_misses += len(missing)
+            self._text_cache_hits += len(prompts) - len(missing)
+        if missing:
+            self._encode_missing(missing)
+        
+        with self._text_cache_lock:
+            entries = [self._text_cache[prompt] for prompt in prompts]
+            for prompt in prompts:
+                self._text_cache.move_to_end(prompt)
+            while len(self._text_cache) > self.text_cache_size:
+                self._text_cache.popitem(last=False)
+        
+        # Re-pad the cached encodings into a batch (T5 pads on the right)
+        max_length = max(ids.shape[0] for ids, _ in entries)
+        if self.compile_decoder:
+            max_length = -(-max_length // PROMPT_LENGTH_BUCKET) * PROMPT_LENGTH_BUCKET
+        hidden_size = entries[0][1].shape[-1]
+        pad_token_id = self.processor.tokenizer.pad_token_id
         
-        # Process all prompts
+        # Staged in pinned memory on CUDA so the uploads below don't block
+        pin = self.device.type == "cuda"
+        input_ids = torch.full((len(prompts), max_length), pad_token_id, dtype=torch.long, pin_memory=pin)
+        attention_mask = torch.zeros((len(prompts), max_length), dtype=torch.long, pin_memory=pin)
+        encoder_hidden_states = torch.zeros(
+            (len(prompts), max_length, hidden_size), dtype=entries[0][1].dtype, pin_memory=pin
+        )
+        for i, (ids, hidden) in enumerate(entries):
+            input_ids[i, :ids.shape[0]] = ids
+            attention_mask[i, :ids.shape[0]] = 1
+            encoder_hidden_states[i, :ids.shape[0]] = hidden
+        
+        return (
+            input_ids.to(self.device, non_blocking=True),
+            attention_mask.to(self.device, non_blocking=True),
+            encoder_hidden_states.to(self.device, non_blocking=True)
+        )
+    
+    def _encode_missing(self, prompts: tp.List[str]):
+        """T5-encode prompts and add them to the text cache."""
         inputs = self.processor(
             text=prompts,
             padding=True,
             return_tensors="pt"
         ).to(self.device)
+        hidden_states = self.model.get_text_encoder()(**inputs).last_hidden_state
         
-        # Generate all at once
-        with torch.no_grad():
-            audio_values = self.model.generate(
-                **inputs,
-                max_new_tokens=tokens_needed,
-                do_sample=True,
-                guidance_scale=1.5,
-                temperature=1.2,
-                top_k=250,
-                top_p=0.95
+        entries = {}
+        for i, prompt in enumerate(prompts):
+            length = int(inputs.attention_mask[i].sum())
+            entries[prompt] = (
+                inputs.input_ids[i, :length].cpu(),
+                hidden_states[i, :length].cpu()
+            )
+        
+        with self._text_cache_lock:
+            self._text_cache.update(entries)
+    
+    def _prefetch_worker(self, prompts: tp.List[str]):
+        """Encode prompts on the prefetch thread (grad mode and autocast are per-thread)."""
+        stream = torch.cuda.stream(self._prefetch_stream) if self._prefetch_stream else contextlib.nullcontext()
+        with torch.inference_mode(), self._autocast(), stream:
+            # Copying the hidden states to the CPU waits for this stream only, so
+            # the entries are complete by the time the future resolves
+            self._encode_missing(prompts)
+    
+    def prefetch(self, prompts: tp.List[str]) -> Future:
+        """
+        Start T5-encoding prompts in the background.
+        
+        Call this with the next request's prompts before generating the current
+        one: tokenization and the text encoder then overlap the current decode,
+        and the next generate()/generate_batch() finds the encodings cached.
+        
+        Args:
+            prompts: List of text prompts
+            
+        Returns:
+            Future that completes when the prompts are encoded
+        """
+        with self._text_cache_lock:
+            missing = [
+                prompt for prompt in dict.fromkeys(prompts)
+                if prompt not in self._text_cache and prompt not in self._pending_encodes
+            ]
+        
+        if self._prefetch_executor is None:
+            self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resonantgen-prefetch")
+        
+        future = self._prefetch_executor.submit(self._prefetch_worker, missing) if missing else Future()
+        if missing:
+            for prompt in missing:
+                self._pending_encodes[prompt] = future
+        else:
+            future.set_result(None)
+        return future
+    
+    def _cache_keys(self, 
+                    prompts: tp.List[str], 
+                    duration: float, 
+                    gen_kwargs: tp.Dict[str, tp.Any]) -> tp.List[str]:
+        """
+        Cache keys covering everything that affects each prompt's generated audio.
+        
+        A seed drives the global RNG that samples every row of the batch at
+        once, so a seeded row's audio also depends on the rest of the batch;
+        seeded keys include the batch's prompts.
+        """
+        batch = {"batch": list(prompts)} if "seed" in gen_kwargs else {}
+        return [
+            self.cache.make_key(
+                prompt,
+                duration,
+                model_size=self.model_size,
+                model_revision=self.model_revision,
+                quantize=self.quantize,
+                **batch,
+                **self._generation_params(gen_kwargs)
+            )
+            for prompt in prompts
+        ]
+    
+    def generate(self, prompt: str, duration: float = 8.0, **gen_kwargs) -> torch.Tensor:
+        """
+        Generate audio from text prompt.
+        
+        Args:
+            prompt: Text description of the music to generate
+            duration: Duration in seconds (approximate)
+            **gen_kwargs: Per-call overrides of generation_params
+                (e.g. guidance_scale=2.0, temperature=1.0), and seed=<int> for
+                reproducible sampling (and cache entries per seed)
+            
+        Returns:
+            Audio tensor [1, samples] at model's sample rate
+        """
+        # One code path (padding, attention mask, cache) for single and batched calls
+        return self.generate_batch([prompt], duration, **gen_kwargs)[0]
+    
+    def generate_batch(self, 
+                       prompts: tp.List[str], 
+                       duration: float = 8.0, 
+                       **gen_kwargs) -> tp.List[torch.Tensor]:
+        """
+        Generate multiple tracks in parallel for efficiency.
+        
+        Args:
+            prompts: List of text prompts
+            duration: Duration for each track
+            **gen_kwargs: Per-call overrides of generation_params
+            
+        Returns:
+            List of audio tensors, each [1, samples]
+        """
+        if self.cache is None:
+            return list(self._generate(prompts, duration, **gen_kwargs))
+        
+        # Serve hits from the cache and generate only the misses, still as one batch
+        keys = self._cache_keys(prompts, duration, gen_kwargs)
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, audio in enumerate(results) if audio is None]
+        if missing and "seed" in gen_kwargs:
+            # Seeded audio depends on the whole batch: regenerating just the
+            # misses would sample them differently than the entries they're keyed with
+            missing = list(range(len(prompts)))
+        
+        if missing:
+            generated = self._generate([prompts[i] for i in missing], duration, **gen_kwargs)
+            for i, audio in zip(missing, generated):
+                self.cache.put(keys[i], audio)
+                results[i] = audio
+        
+        return results
+    
+    def generate_stream(self, 
+                        prompts: tp.List[str], 
+                        on_audio: AudioSink, 
+                        duration: float = 8.0, 
+                        play_steps: int = 50, 
+                        **gen_kwargs) -> tp.List[torch.Tensor]:
+        """
+        Generate a batch while handing finished audio to a callback as it decodes.
+        
+        Every `play_steps` tokens (50 ≈ 1 second) the audio so far is decoded
+        in the background and the new samples are passed to on_audio (see
+        AudioSink; WavStreamWriter writes them to files), so exporting overlaps
+        the rest of the generation. Fully cached batches are passed on as one
+        final chunk.
+        
+        Args:
+            prompts: List of text prompts
+            on_audio: Callback receiving ([batch, 1, samples] chunk, final)
+            duration: Duration for each track
+            play_steps: Generated tokens per streamed chunk
+            **gen_kwargs: Per-call overrides of generation_params
+            
+        Returns:
+            List of complete audio tensors, each [1, samples], identical to
+            what on_audio received
+        """
+        if self.cache is not None:
+            keys = self._cache_keys(prompts, duration, gen_kwargs)
+            results = [self.cache.get(key) for key in keys]
+            if all(audio is not None for audio in results):
+                on_audio(torch.stack(results), True)
+                return results
+        
+        streamer = AudioStreamer(self.model, on_audio, play_steps=play_steps)
+        try:
+            self._generate(prompts, duration, streamer=streamer, **gen_kwargs)
+            # Return (and cache) the streamed samples rather than the final full
+            # decode, so the audio the sink wrote and the audio returned match
+            generated = list(streamer.audio)
+        finally:
+            # No-ops after a normal end(); if generate raised, this stops the
+            # decode worker and finalizes whatever the sink has written
+            streamer.close()
+            close_sink = getattr(on_audio, "close", None)
+            if close_sink is not None:
+                close_sink()
+        
+        if self.cache is not None:
+            for key, audio in zip(keys, generated):
+                self.cache.put(key, audio)
+        
+        return generated
+    
+    def _generate_on_stream(self,
+                            stream: torch.cuda.Stream,
+                            prompts: tp.List[str],
+                            duration: float,
+                            gen_kwargs: tp.Dict[str, tp.Any]) -> tp.List[torch.Tensor]:
+        """generate_batch() with all of its kernels issued on the given stream."""
+        with torch.cuda.stream(stream):
+            # The copy to the CPU at the end only waits for this stream
+            return self.generate_batch(prompts, duration, **gen_kwargs)
+    
+    def generate_multi(self, 
+                       prompts: tp.List[str], 
+                       durations: tp.List[float], 
+                       **gen_kwargs) -> tp.List[torch.Tensor]:
+        """
+        Generate prompts that don't share a duration.
+        
+        Prompts with equal durations are still batched together; each distinct
+        duration then decodes concurrently on its own CUDA stream (driven by
+        its own host thread), so the small decoder's kernels interleave
+        instead of leaving the GPU idle between launches. Runs the groups one
+        after another on CPU, with a compiled decoder (CUDA graphs can't be
+        replayed from several threads) or with a seed (the RNG is global).
+        
+        Args:
+            prompts: List of text prompts
+            durations: Duration in seconds for each prompt
+            **gen_kwargs: Per-call overrides of generation_params
+            
+        Returns:
+            List of audio tensors, each [1, samples], in prompt order
+        """
+        groups: tp.Dict[float, tp.List[int]] = {}
+        for i, duration in enumerate(durations):
+            groups.setdefault(duration, []).append(i)
+        
+        results: tp.List[tp.Optional[torch.Tensor]] = [None] * len(prompts)
+        
+        concurrent = (
+            self.device.type == "cuda" 
+            and not self.compile_decoder 
+            and "seed" not in gen_kwargs 
+            and len(groups) > 1
+        )
+        if not concurrent:
+            for duration, indices in groups.items():
+                audio_batch = self.generate_batch([prompts[i] for i in indices], duration, **gen_kwargs)
+                for i, audio in zip(indices, audio_batch):
+                    results[i] = audio
+            return results
+        
+        if self._stream_executor is None:
+            self._streams = [torch.cuda.Stream(device=self.device) for _ in range(self.num_streams)]
+            self._stream_executor = ThreadPoolExecutor(
+                max_workers=self.num_streams, 
+                thread_name_prefix="resonantgen-stream"
             )
         
-        # Return list of individual tracks
-        return [audio[None] for audio in audio_values.cpu()]
+        # Text encodings are made up front on the calling thread, so the stream
+        # threads only run the decoders
+        with torch.inference_mode(), self._autocast():
+            self._encode_text(prompts)
+        
+        futures = [
+            (indices, self._stream_executor.submit(
+                self._generate_on_stream,
+                self._streams[n % self.num_streams],
+                [prompts[i] for i in indices],
+                duration,
+                gen_kwargs
+            ))
+            for n, (duration, indices) in enumerate(groups.items())
+        ]
+        for indices, future in futures:
+            for i, audio in zip(indices, future.result()):
+                results[i] = audio
+        
+        return results
     
     def set_generation_params(self, **kwargs):
-        """Update generation parameters."""
+        """Update the default generation parameters used by every call."""
         if 'max_new_tokens' in kwargs:
-            self.max_new_tokens = kwargs['max_new_tokens']
-        if 'guidance_scale' in kwargs:
-            self.guidance_scale = kwargs['guidance_scale']
-        if 'temperature' in kwargs:
-            self.temperature = kwargs['temperature']
+            self.max_new_tokens = kwargs.pop('max_new_tokens')
+        self.generation_params.update(kwargs)
     
     def get_model_info(self) -> dict:
         """Get information about the loaded model."""
@@ -133,6 +791,17 @@ class MusicGenEngine:
             "model_size": self.model_size,
             "sample_rate": self.sample_rate,
             "device": str(self.device),
+            "dtype": str(self.dtype),
+            "precision": self.precision,
+            "attention": self.attn_implementation,
+            "compiled": self.compile_decoder,
+            "quantize": self.quantize,
+            "cache": str(self.cache.cache_dir) if self.cache else None,
+            "text_cache": {
+                "entries": len(self._text_cache),
+                "hits": self._text_cache_hits,
+                "misses": self._text_cache_misses,
+            },
             "max_tokens": self.max_new_tokens,
             "parameters": sum(p.numel() for p in self.model.parameters()) / 1e6
         }
\ No newline at end of file
@@ -0,0 +1,349 @@
+"""
+ONNX MusicGen Engine - MusicGen with the decoder running in ONNX Runtime
+
+The autoregressive decoder is where generation time goes, so it is exported
+once to ONNX and run through ONNX Runtime (TensorRT, CUDA or CoreML execution
+providers when available). The T5 text encoder, delay pattern handling and
+EnCodec decoding still run once per generation on the torch model.
+
+Requires onnxruntime (`pip install resonantgen[onnx]`).
+"""
+
+import typing as tp
+from pathlib import Path
+
+import torch
+
+try:
+    import onnxruntime as ort
+except ImportError as e:  # Optional dependency
+    raise ImportError(
+        "The ONNX backend needs onnxruntime: pip install resonantgen[onnx]"
+    ) from e
+
+from .audio_cache import DEFAULT_CACHE_DIR
+from .musicgen_engine import MusicGenEngine
+from .streaming import AudioStreamer
+
+
+# Execution providers in order of preference (unavailable ones are skipped)
+CUDA_PROVIDERS = [
+    ("TensorrtExecutionProvider", {"trt_fp16_enable": True}),
+    "CUDAExecutionProvider",
+]
+CPU_PROVIDERS = [
+    "CoreMLExecutionProvider",
+    "CPUExecutionProvider",
+]
+
+# Per-layer KV cache entries, in the order of the legacy cache tuples
+KV_NAMES = ("decoder.key", "decoder.value", "encoder.key", "encoder.value")
+
+
+class _DecoderStep(torch.nn.Module):
+    """One MusicGen decoder step with the KV cache flattened into plain tensors."""
+
+    def __init__(self, decoder: torch.nn.Module, with_past: bool):
+        super().__init__()
+        self.decoder = decoder
+        self.with_past = with_past
+        self.num_layers = decoder.config.num_hidden_layers
+
+    def forward(self, input_ids, encoder_hidden_states, encoder_attention_mask, *past):
+        past_key_values = None
+        if self.with_past:
+            past_key_values = tuple(
+                tuple(past[4 * i:4 * i + 4]) for i in range(self.num_layers)
+            )
+
+        outputs = self.decoder(
+            input_ids=input_ids,
+            encoder_hidden_states=encoder_hidden_states,
+            encoder_attention_mask=encoder_attention_mask,
+            past_key_values=past_key_values,
+            use_cache=True,
+            return_dict=True
+        )
+
+        present = outputs.past_key_values
+        if hasattr(present, "to_legacy_cache"):
+            present = present.to_legacy_cache()
+        return (outputs.logits[:, -1, :], *[kv for layer in present for kv in layer])
+
+
+class OnnxMusicGenEngine(MusicGenEngine):
+    """
+    MusicGenEngine whose decoder loop runs in ONNX Runtime.
+
+    Drop-in replacement for MusicGenEngine (same generate/generate_batch API and
+    cache behaviour); select it with MusicWorkstation(backend="onnx").
+    """
+
+    backend = "onnx"
+
+    def __init__(self,
+                 model_size: str = "small",
+                 device: torch.device = None,
+                 use_cache: bool = False,
+                 cache_dir: tp.Optional[str] = None,
+                 onnx_dir: tp.Optional[str] = None):
+        """
+        Initialize the engine, exporting the decoder to ONNX on first use.
+
+        Args:
+            model_size: Size of model ("small", "medium", "large")
+            device: Torch device for the text encoder and EnCodec
+            use_cache: Serve repeated identical requests from the on-disk audio cache
+            cache_dir: Cache directory (default: ~/.cache/resonantgen)
+            onnx_dir: Where the exported decoder lives
+                (default: ~/.cache/resonantgen/onnx/musicgen-<size>)
+        """
+        # Exported in FP32; TensorRT builds its own FP16 engine from it
+        super().__init__(
+            model_size=model_size,
+            device=device,
+            half_precision=False,
+            use_cache=use_cache,
+            cache_dir=cache_dir
+        )
+
+        self.onnx_dir = Path(onnx_dir) if onnx_dir else DEFAULT_CACHE_DIR / "onnx" / f"musicgen-{model_size}"
+        self.num_layers = self.model.decoder.config.num_hidden_layers
+        self.num_codebooks = self.model.decoder.config.num_codebooks
+        self.past_names = [f"past.{i}.{kv}" for i in range(self.num_layers) for kv in KV_NAMES]
+        self.present_names = [f"present.{i}.{kv}" for i in range(self.num_layers) for kv in KV_NAMES]
+
+        prefill_path = self.onnx_dir / "decoder_prefill.onnx"
+        step_path = self.onnx_dir / "decoder_step.onnx"
+        if not (prefill_path.exists() and step_path.exists()):
+            self._export_decoder(prefill_path, step_path)
+
+        providers = self._select_providers()
+        self.prefill_session = ort.InferenceSession(str(prefill_path), providers=providers)
+        self.step_session = ort.InferenceSession(str(step_path), providers=providers)
+
+        # Keep decoder outputs (the KV cache) on the accelerator between steps
+        self.providers = self.step_session.get_providers()
+        self.ort_device = "cuda" if self.providers[0] in ("TensorrtExecutionProvider", "CUDAExecutionProvider") else "cpu"
+
+        print(f"   ONNX Runtime decoder: {self.providers[0]}")
+
+    def _select_providers(self) -> tp.List[tp.Union[str, tp.Tuple[str, dict]]]:
+        """Preferred execution providers that this onnxruntime build has."""
+        available = set(ort.get_available_providers())
+        preferred = (CUDA_PROVIDERS if self.device.type == "cuda" else []) + CPU_PROVIDERS
+        return [
+            provider for provider in preferred
+            if (provider[0] if isinstance(provider, tuple) else provider) in available
+        ]
+
+    def _export_decoder(self, prefill_path: Path, step_path: Path):
+        """
+        Export the decoder as two graphs: the first step (no KV cache yet) and
+        every following step (consumes and returns the KV cache).
+        """
+        print(f"   Exporting MusicGen decoder to {self.onnx_dir} (one-time)...")
+        self.onnx_dir.mkdir(parents=True, exist_ok=True)
+
+        decoder = self.model.decoder
+        hidden_size = decoder.config.hidden_size
+        start_token_id = self.model.generation_config.decoder_start_token_id
+
+        # Example inputs: one prompt plus its null condition
+        input_ids = torch.full((2 * self.num_codebooks, 1), start_token_id, dtype=torch.long, device=self.device)
+        encoder_hidden_states = torch.randn(2, 8, hidden_size, device=self.device)
+        encoder_attention_mask = torch.ones(2, 8, dtype=torch.long, device=self.device)
+
+        encoder_axes = {
+            "input_ids": {0: "batch_codebooks"},
+            "encoder_hidden_states": {0: "batch", 1: "encoder_sequence"},
+            "encoder_attention_mask": {0: "batch", 1: "encoder_sequence"},
+            "logits": {0: "batch_codebooks"},
+        }
+        present_axes = {
+            name: {0: "batch", 2: "encoder_sequence" if "encoder" in name else "total_sequence"}
+            for name in self.present_names
+        }
+        past_axes = {
+            name: {0: "batch", 2: "encoder_sequence" if "encoder" in name else "past_sequence"}
+            for name in self.past_names
+        }
+
+        with torch.no_grad():
+            prefill = _DecoderStep(decoder, with_past=False)
+            torch.onnx.export(
+                prefill,
+                (input_ids, encoder_hidden_states, encoder_attention_mask),
+                str(prefill_path),
+                input_names=["input_ids", "encoder_hidden_states", "encoder_attention_mask"],
+                output_names=["logits", *self.present_names],
+                dynamic_axes={**encoder_axes, **present_axes},
+                opset_version=17
+            )
+
+            past = prefill(input_ids, encoder_hidden_states, encoder_attention_mask)[1:]
+            torch.onnx.export(
+                _DecoderStep(decoder, with_past=True),
+                (input_ids, encoder_hidden_states, encoder_attention_mask, *past),
+                str(step_path),
+                input_names=["input_ids", "encoder_hidden_states", "encoder_attention_mask", *self.past_names],
+                output_names=["logits", *self.present_names],
+                dynamic_axes={**encoder_axes, **past_axes, **present_axes},
+                opset_version=17
+            )
+
+    def _to_ortvalue(self, tensor: torch.Tensor) -> "ort.OrtValue":
+        """Copy a tensor into an OrtValue on the decoder's device."""
+        return ort.OrtValue.ortvalue_from_numpy(tensor.contiguous().cpu().numpy(), self.ort_device, 0)
+
+    def _run_decoder(self,
+                     session: "ort.InferenceSession",
+                     inputs: tp.Dict[str, "ort.OrtValue"]) -> tp.Dict[str, "ort.OrtValue"]:
+        """Run one decoder step with IO-binding, leaving outputs on the decoder's device."""
+        binding = session.io_binding()
+        for name, value in inputs.items():
+            binding.bind_ortvalue_input(name, value)
+        for name in ["logits", *self.present_names]:
+            binding.bind_output(name, self.ort_device)
+
+        session.run_with_iobinding(binding)
+        return dict(zip(["logits", *self.present_names], binding.get_outputs()))
+
+    def _sample(self, logits: torch.Tensor, params: tp.Dict[str, tp.Any]) -> torch.Tensor:
+        """Pick the next token per row, matching transformers' sampling warpers."""
+        if not params.get("do_sample", True):
+            return logits.argmax(dim=-1)
+
+        logits = logits / params.get("temperature", 1.0)
+
+        top_k = params.get("top_k")
+        if top_k:
+            kth_best = torch.topk(logits, min(top_k, logits.shape[-1])).values[..., -1, None]
+            logits = logits.masked_fill(logits < kth_best, -float("inf"))
+
+        top_p = params.get("top_p")
+        if top_p is not None and top_p < 1.0:
+            sorted_logits, sorted_indices = torch.sort(logits, descending=False)
+            cumulative_probs = sorted_logits.softmax(dim=-1).cumsum(dim=-1)
+            sorted_to_remove = cumulative_probs <= (1 - top_p)
+            sorted_to_remove[..., -1:] = False  # Always keep the best token
+            to_remove = sorted_to_remove.scatter(1, sorted_indices, sorted_to_remove)
+            logits = logits.masked_fill(to_remove, -float("inf"))
+
+        probs = logits.softmax(dim=-1)
+        return torch.multinomial(probs, num_samples=1).squeeze(1)
+
+    def _generate(self,
+                  prompts: tp.List[str],
+                  duration: float,
+                  streamer: tp.Optional[AudioStreamer] = None,
+                  **gen_kwargs) -> torch.Tensor:
+        """
+        Run MusicGen on a batch of prompts, bypassing the cache.
+
+        Args:
+            prompts: List of text prompts
+            duration: Duration in seconds (approximate)
+            streamer: Optional AudioStreamer fed each generated step
+            **gen_kwargs: Per-call overrides of generation_params
+
+        Returns:
+            Audio tensor [batch, 1, samples] on CPU in FP32
+        """
+        tokens_needed = self.tokens_for_duration(duration)
+
+        batch_size = len(prompts)
+        decoder = self.model.decoder
+        start_token_id = self.model.generation_config.decoder_start_token_id
+        pad_token_id = self.model.generation_config.pad_token_id
+        seed = gen_kwargs.pop("seed", None)
+        if seed is not None:
+            torch.manual_seed(seed)
+
+        params = self._generation_params(gen_kwargs)
+        guidance_scale = params.get("guidance_scale", self.model.generation_config.guidance_scale)
+        use_guidance = guidance_scale is not None and guidance_scale > 1
+
+        with torch.inference_mode():
+            _, attention_mask, encoder_hidden_states = self._encode_text(prompts)
+
+            # Null condition for classifier-free guidance, as in MusicGenEngine
+            if use_guidance:
+                encoder_hidden_states = torch.cat(
+                    [encoder_hidden_states, torch.zeros_like(encoder_hidden_states)], dim=0
+                )
+                attention_mask = torch.cat(
+                    [attention_mask, torch.zeros_like(attention_mask)], dim=0
+                )
+
+            # What MusicgenForConditionalGeneration.forward does before its decoder
+            if getattr(self.model, "enc_to_dec_proj", None) is not None:
+                encoder_hidden_states = self.model.enc_to_dec_proj(encoder_hidden_states)
+            encoder_hidden_states = encoder_hidden_states * attention_mask[..., None]
+
+            # Token buffer for the whole generation, with the codebook delay pattern
+            input_ids = torch.full((batch_size * self.num_codebooks, 1), start_token_id, dtype=torch.long)
+            input_ids, delay_pattern_mask = decoder.build_delay_pattern_mask(
+                input_ids,
+                pad_token_id=start_token_id,
+                max_length=tokens_needed + 1
+            )
+            input_ids = torch.cat(
+                [input_ids, torch.zeros((input_ids.shape[0], tokens_needed), dtype=torch.long)], dim=-1
+            )
+            delay_pattern_mask = delay_pattern_mask.cpu()
+            if streamer is not None:
+                streamer.put(input_ids[:, :1])
+
+            encoder_inputs = {
+                "encoder_hidden_states": self._to_ortvalue(encoder_hidden_states.float()),
+                "encoder_attention_mask": self._to_ortvalue(attention_mask),
+            }
+            past = None
+
+            for step in range(tokens_needed):
+                # Current token for every codebook, with delayed positions forced
+                step_mask = delay_pattern_mask[:, step]
+                step_ids = torch.where(step_mask == -1, input_ids[:, step], step_mask)[:, None]
+                if use_guidance:
+                    step_ids = step_ids.repeat(2, 1)
+
+                inputs = {"input_ids": self._to_ortvalue(step_ids), **encoder_inputs}
+                if past is None:
+                    outputs = self._run_decoder(self.prefill_session, inputs)
+                else:
+                    outputs = self._run_decoder(self.step_session, {**inputs, **dict(zip(self.past_names, past))})
+                past = [outputs[name] for name in self.present_names]
+
+                # Only the last-position logits come back to the host
+                logits = torch.from_numpy(outputs["logits"].numpy()).float()
+                if use_guidance:
+                    cond_logits, uncond_logits = logits.split(batch_size * self.num_codebooks, dim=0)
+                    logits = uncond_logits + (cond_logits - uncond_logits) * guidance_scale
+
+                input_ids[:, step + 1] = self._sample(logits, params)
+                if streamer is not None:
+                    streamer.put(input_ids[:, step + 1])
+
+            if streamer is not None:
+                streamer.end()
+
+            # Undo the delay pattern and drop the padding, as transformers does
+            output_ids = decoder.apply_delay_pattern_mask(input_ids, delay_pattern_mask)
+            output_ids = output_ids[output_ids != pad_token_id].reshape(
+                batch_size, self.num_codebooks, -1
+            )
+
+            audio_values = self.model.audio_encoder.decode(
+                output_ids[None, ...].to(self.device),
+                audio_scales=[None] * batch_size
+            ).audio_values
+
+        return self._to_host(audio_values.float())
+
+    def get_model_info(self) -> dict:
+        """Get information about the loaded model."""
+        info = super().get_model_info()
+        info["backend"] = "onnx"
+        info["providers"] = self.providers
+        return info
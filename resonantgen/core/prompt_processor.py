@@ -7,7 +7,15 @@ musical intent and convert it to effective MusicGen prompts.
 
 import typing as tp
 import re
-from dataclasses import dataclass
+import string
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+
+try:
+    import ahocorasick
+except ImportError:  # Optional dependency
+    ahocorasick = None
 
 
 @dataclass
@@ -35,6 +43,15 @@ class MusicContext:
             self.instruments = {}
         if self.style_tags is None:
             self.style_tags = []
+    
+    def copy(self) -> "MusicContext":
+        """Copy whose lists and instruments can be modified independently."""
+        return replace(
+            self,
+            mood=list(self.mood),
+            instruments={track_type: list(found) for track_type, found in self.instruments.items()},
+            style_tags=list(self.style_tags)
+        )
 
 
 class PromptProcessor:
@@ -45,7 +62,68 @@ class PromptProcessor:
     This is a key component that enables ResonantGen's natural language interface.
     """
     
+    # Tracks every session is generated with
+    TRACK_NAMES: tp.Tuple[str, ...] = ("drums", "bass", "harmony", "melody")
+    
+    # Track prompt templates. Fields: {style} (track-specific style), {base_style},
+    # {genre}, {tempo}, {mood}. Read-only; to customise, assign a new mapping to
+    # the class (or subclass) before creating the processor.
+    TRACK_TEMPLATES: tp.Mapping[str, str] = MappingProxyType({
+        "drums": "drums only, {style}, {base_style}, no bass no melody no harmony",
+        "bass": "bass line only, {style}, {base_style}, no drums no melody no harmony",
+        "harmony": "chord progression only, {style}, {base_style}, no drums no bass no melody",
+        "melody": "melody only, {style}, {base_style}, no drums no bass no harmony",
+    })
+    
+    # Track-specific {style} per genre, with the "default" entry for any other genre
+    TRACK_STYLES: tp.Mapping[str, tp.Mapping[str, str]] = MappingProxyType({
+        "drums": MappingProxyType({
+            "lo-fi": "laid back swing, vintage drum samples",
+            "techno": "four on the floor kick, electronic percussion",
+            "hip-hop": "boom bap pattern, punchy snare",
+            "default": "rhythmic pattern",
+        }),
+        "bass": MappingProxyType({
+            "lo-fi": "warm analog bass, smooth low end",
+            "techno": "driving electronic bass, sub frequencies",
+            "hip-hop": "deep 808 bass, punchy low end",
+            "default": "bass line",
+        }),
+        "harmony": MappingProxyType({
+            "lo-fi": "jazzy chords, warm keys, vintage electric piano",
+            "techno": "atmospheric pads, electronic textures",
+            "jazz": "complex jazz chords, piano comping",
+            "default": "chord progression",
+        }),
+        "melody": MappingProxyType({
+            "lo-fi": "subtle melody, atmospheric lead, vinyl texture",
+            "techno": "electronic lead, synthesizer melody",
+            "jazz": "improvised solo, melodic phrases",
+            "default": "melodic line",
+        }),
+    })
+    
     def __init__(self):
+        # Compile the templates once instead of parsing a format string per prompt
+        self.track_templates = {
+            track_name: string.Template(re.sub(r"\{(\w+)\}", r"${\1}", template))
+            for track_name, template in type(self).TRACK_TEMPLATES.items()
+        }
+        
+        # "no bass no harmony no melody" etc. for regeneration prompts
+        self._exclusions = {
+            track_name: "no " + " no ".join(other for other in self.TRACK_NAMES if other != track_name)
+            for track_name in self.TRACK_NAMES
+        }
+        
+        # Analysis is deterministic, so repeated prompts (and contexts) are
+        # served from per-instance caches, least recently used first: prompt ->
+        # context, and context fields (see _style_key) -> track prompts / base style
+        self._analysis_cache: "OrderedDict[str, MusicContext]" = OrderedDict()
+        self._track_prompts_cache: "OrderedDict[tp.Tuple, tp.Dict[str, str]]" = OrderedDict()
+        self._base_style_cache: "OrderedDict[tp.Tuple, str]" = OrderedDict()
+        self.cache_size = 256
+        
         # Genre keywords
         self.genre_patterns = {
             "lo-fi": ["lo-fi", "lofi", "low-fi"],
@@ -77,6 +155,56 @@ class PromptProcessor:
             "harmony": ["chords", "harmony", "keys", "piano", "pads", "strings"],
             "melody": ["melody", "lead", "solo", "hook", "riff"]
         }
+        
+        # Style descriptors
+        self.style_words = [
+            "analog", "digital", "vintage", "modern", "retro",
+            "warm", "cold", "punchy", "smooth", "rough",
+            "swing", "straight", "triplets", "syncopated"
+        ]
+        
+        # Every keyword above, found in one pass over the prompt by _scan()
+        self._keywords = set(self.style_words)
+        for patterns in (self.genre_patterns, self.mood_patterns, self.instrument_patterns):
+            for keywords in patterns.values():
+                self._keywords.update(keywords)
+        
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self._keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            
+            # One regex pass instead: the lookahead reports the longest keyword
+            # starting at each position, and the keywords contained in it
+            # (e.g. "jazz" in "jazzy") are filled in from a precomputed table
+            alternation = "|".join(map(re.escape, sorted(self._keywords, key=len, reverse=True)))
+            self._keyword_re = re.compile(f"(?=({alternation}))")
+            self._contained_keywords = {
+                keyword: frozenset(other for other in self._keywords if other in keyword)
+                for keyword in self._keywords
+            }
+        
+        # Tempo patterns like "120 BPM", "at 90bpm", "72 beats per minute"
+        self._tempo_res = [
+            re.compile(pattern) for pattern in (
+                r'(\d+)\s*bpm',
+                r'(\d+)\s*beats per minute',
+                r'at\s+(\d+)',
+                r'(\d+)\s*(beat|tempo)'
+            )
+        ]
+        
+        # Key signatures like "in C minor", "A major", "Dm"
+        self._key_res = [
+            re.compile(pattern) for pattern in (
+                r'in\s+([A-G][#b]?)\s+(major|minor)',
+                r'([A-G][#b]?)\s+(major|minor)',
+                r'([A-G][#b]?m)\b',  # Shorthand like "Dm"
+            )
+        ]
     
     def analyze(self, prompt: str) -> MusicContext:
         """
@@ -86,21 +214,28 @@ class PromptProcessor:
             prompt: Natural language description of music
             
         Returns:
-            MusicContext with extracted musical information
+            MusicContext with extracted musical information (a fresh copy on
+            every call, so it can be modified)
         """
+        # The cached context stays private; callers get their own copy to modify
+        return self._cached(self._analysis_cache, prompt, self._analyze, prompt).copy()
+    
+    def _analyze(self, prompt: str) -> MusicContext:
+        """Uncached analyze()."""
         prompt_lower = prompt.lower()
+        keywords = self._scan(prompt_lower)
         
         # Extract basic parameters
-        genre = self._extract_genre(prompt_lower)
-        mood = self._extract_mood(prompt_lower) 
+        genre = self._extract_genre(keywords)
+        mood = self._extract_mood(keywords) 
         tempo = self._extract_tempo(prompt_lower)
         key = self._extract_key(prompt_lower)
         
         # Extract instrumentation hints
-        instruments = self._extract_instruments(prompt_lower)
+        instruments = self._extract_instruments(keywords)
         
         # Extract style descriptors
-        style_tags = self._extract_style_tags(prompt_lower)
+        style_tags = self._extract_style_tags(keywords)
         energy_level = self._estimate_energy_level(mood, style_tags)
         
         return MusicContext(
@@ -113,6 +248,22 @@ class PromptProcessor:
             energy_level=energy_level
         )
     
+    def _cached(self, cache: OrderedDict, key: tp.Hashable, compute: tp.Callable, *args):
+        """Return cache[key], computing it with compute(*args) (and evicting the oldest entry) on a miss."""
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        
+        value = cache[key] = compute(*args)
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
+    
+    @staticmethod
+    def _style_key(context: MusicContext) -> tp.Tuple:
+        """The context fields that track prompts and the base style are built from."""
+        return (context.genre, tuple(context.mood), context.tempo, tuple(context.style_tags))
+    
     def create_track_prompts(self, context: MusicContext) -> tp.Dict[str, str]:
         """
         Create track-specific prompts for MusicGen based on musical context.
@@ -123,27 +274,30 @@ class PromptProcessor:
         Returns:
             Dictionary mapping track names to specific prompts
         """
-        base_style = self._create_base_style_string(context)
-        
-        prompts = {}
-        
-        # Drums prompt
-        drums_style = self._get_drum_style(context)
-        prompts["drums"] = f"drums only, {drums_style}, {base_style}, no bass no melody no harmony"
-        
-        # Bass prompt  
-        bass_style = self._get_bass_style(context)
-        prompts["bass"] = f"bass line only, {bass_style}, {base_style}, no drums no melody no harmony"
-        
-        # Harmony prompt
-        harmony_style = self._get_harmony_style(context)
-        prompts["harmony"] = f"chord progression only, {harmony_style}, {base_style}, no drums no bass no melody"
+        return dict(self._cached(self._track_prompts_cache, self._style_key(context), self._create_track_prompts, context))
+    
+    def _create_track_prompts(self, context: MusicContext) -> tp.Dict[str, str]:
+        """Uncached create_track_prompts()."""
+        fields = {
+            "base_style": self._create_base_style_string(context),
+            "genre": context.genre,
+            "tempo": context.tempo if context.tempo else "",
+            "mood": ", ".join(context.mood),
+        }
         
-        # Melody prompt
-        melody_style = self._get_melody_style(context)
-        prompts["melody"] = f"melody only, {melody_style}, {base_style}, no drums no bass no harmony"
+        track_styles = {
+            "drums": self._get_drum_style,
+            "bass": self._get_bass_style,
+            "harmony": self._get_harmony_style,
+            "melody": self._get_melody_style,
+        }
         
-        return prompts
+        # Track prompts are deterministic for a given context, so repeated
+        # contexts hit the engine's text-encoding cache
+        return {
+            track_name: template.substitute(fields, style=track_styles[track_name](context))
+            for track_name, template in self.track_templates.items()
+        }
     
     def create_regeneration_prompt(self, 
                                    track_name: str,
@@ -165,52 +319,51 @@ class PromptProcessor:
         base_style = self._create_base_style_string(original_context)
         
         # Add tempo/key constraints from locked tracks if available
-        constraints = []
-        if locked_context.get("locked_track_names"):
-            constraints.append("matching tempo and key")
-            
-        # Create exclusions for other track types
-        other_tracks = ["drums", "bass", "harmony", "melody"]
-        other_tracks.remove(track_name)
-        exclusions = f"no {' no '.join(other_tracks)}"
+        constraint_str = ", matching tempo and key" if locked_context.get("locked_track_names") else ""
         
-        # Combine everything
-        constraint_str = ", ".join(constraints) if constraints else ""
-        if constraint_str:
-            constraint_str = f", {constraint_str}"
+        return f"{track_name} only, {new_description}, {base_style}{constraint_str}, {self._exclusions[track_name]}"
+    
+    def _scan(self, prompt: str) -> tp.Set[str]:
+        """
+        Find every known keyword that occurs in the prompt (as a substring).
         
-        return f"{track_name} only, {new_description}, {base_style}{constraint_str}, {exclusions}"
+        With pyahocorasick installed this is a single Aho-Corasick pass over
+        the prompt, otherwise a single precompiled regex pass, instead of one
+        substring search per keyword.
+        
+        Args:
+            prompt: Lowercased prompt
+            
+        Returns:
+            Set of keywords present in the prompt
+        """
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(prompt)}
+        
+        found: tp.Set[str] = set()
+        for keyword in self._keyword_re.findall(prompt):
+            found |= self._contained_keywords[keyword]
+        return found
     
-    def _extract_genre(self, prompt: str) -> str:
-        """Extract genre from prompt."""
+    def _extract_genre(self, keywords: tp.Set[str]) -> str:
+        """Extract genre from the prompt's keywords."""
         for genre, patterns in self.genre_patterns.items():
-            for pattern in patterns:
-                if pattern in prompt:
-                    return genre
+            if not keywords.isdisjoint(patterns):
+                return genre
         return "electronic"  # default
     
-    def _extract_mood(self, prompt: str) -> tp.List[str]:
-        """Extract mood descriptors from prompt."""
-        moods = []
-        for mood, patterns in self.mood_patterns.items():
-            for pattern in patterns:
-                if pattern in prompt:
-                    moods.append(mood)
-                    break
+    def _extract_mood(self, keywords: tp.Set[str]) -> tp.List[str]:
+        """Extract mood descriptors from the prompt's keywords."""
+        moods = [
+            mood for mood, patterns in self.mood_patterns.items()
+            if not keywords.isdisjoint(patterns)
+        ]
         return moods or ["neutral"]
     
     def _extract_tempo(self, prompt: str) -> tp.Optional[int]:
         """Extract tempo from prompt."""
-        # Look for patterns like "120 BPM", "at 90bpm", "72 beats per minute"
-        tempo_patterns = [
-            r'(\d+)\s*bpm',
-            r'(\d+)\s*beats per minute',
-            r'at\s+(\d+)',
-            r'(\d+)\s*(beat|tempo)'
-        ]
-        
-        for pattern in tempo_patterns:
-            match = re.search(pattern, prompt)
+        for pattern in self._tempo_res:
+            match = pattern.search(prompt)
             if match:
                 return int(match.group(1))
         
@@ -218,15 +371,8 @@ class PromptProcessor:
     
     def _extract_key(self, prompt: str) -> tp.Optional[str]:
         """Extract key signature from prompt."""
-        # Look for key signatures like "in C minor", "A major", "Dm"
-        key_patterns = [
-            r'in\s+([A-G][#b]?)\s+(major|minor)',
-            r'([A-G][#b]?)\s+(major|minor)',
-            r'([A-G][#b]?m)\b',  # Shorthand like "Dm"
-        ]
-        
-        for pattern in key_patterns:
-            match = re.search(pattern, prompt)
+        for pattern in self._key_res:
+            match = pattern.search(prompt)
             if match:
                 if len(match.groups()) == 2:
                     return f"{match.group(1)}_{match.group(2)}"
@@ -235,35 +381,21 @@ class PromptProcessor:
         
         return None
     
-    def _extract_instruments(self, prompt: str) -> tp.Dict[str, tp.List[str]]:
+    def _extract_instruments(self, keywords: tp.Set[str]) -> tp.Dict[str, tp.List[str]]:
         """Extract instrument mentions for each track type."""
         instruments = {}
         
         for track_type, patterns in self.instrument_patterns.items():
-            found_instruments = []
-            for pattern in patterns:
-                if pattern in prompt:
-                    found_instruments.append(pattern)
+            found_instruments = [pattern for pattern in patterns if pattern in keywords]
             
             if found_instruments:
                 instruments[track_type] = found_instruments
         
         return instruments
     
-    def _extract_style_tags(self, prompt: str) -> tp.List[str]:
+    def _extract_style_tags(self, keywords: tp.Set[str]) -> tp.List[str]:
         """Extract style descriptors."""
-        style_words = [
-            "analog", "digital", "vintage", "modern", "retro",
-            "warm", "cold", "punchy", "smooth", "rough",
-            "swing", "straight", "triplets", "syncopated"
-        ]
-        
-        found_styles = []
-        for style in style_words:
-            if style in prompt:
-                found_styles.append(style)
-        
-        return found_styles
+        return [style for style in self.style_words if style in keywords]
     
     def _estimate_energy_level(self, moods: tp.List[str], styles: tp.List[str]) -> float:
         """Estimate energy level from mood and style."""
@@ -284,6 +416,11 @@ class PromptProcessor:
     
     def _create_base_style_string(self, context: MusicContext) -> str:
         """Create base style string from context."""
+        # Shared by every track prompt and by each regeneration of a session
+        return self._cached(self._base_style_cache, self._style_key(context), self._base_style_string, context)
+    
+    def _base_style_string(self, context: MusicContext) -> str:
+        """Uncached _create_base_style_string()."""
         parts = []
         
         if context.genre:
@@ -300,46 +437,23 @@ class PromptProcessor:
         
         return ", ".join(parts)
     
+    def _get_track_style(self, track_name: str, genre: str) -> str:
+        """Look up the track-specific style for a genre."""
+        styles = type(self).TRACK_STYLES[track_name]
+        return styles.get(genre, styles["default"])
+    
     def _get_drum_style(self, context: MusicContext) -> str:
         """Get drum-specific style based on context."""
-        if context.genre == "lo-fi":
-            return "laid back swing, vintage drum samples"
-        elif context.genre == "techno":
-            return "four on the floor kick, electronic percussion"
-        elif context.genre == "hip-hop":
-            return "boom bap pattern, punchy snare"
-        else:
-            return "rhythmic pattern"
+        return self._get_track_style("drums", context.genre)
     
     def _get_bass_style(self, context: MusicContext) -> str:
         """Get bass-specific style based on context."""
-        if context.genre == "lo-fi":
-            return "warm analog bass, smooth low end"
-        elif context.genre == "techno":
-            return "driving electronic bass, sub frequencies"
-        elif context.genre == "hip-hop":
-            return "deep 808 bass, punchy low end"
-        else:
-            return "bass line"
+        return self._get_track_style("bass", context.genre)
     
     def _get_harmony_style(self, context: MusicContext) -> str:
         """Get harmony-specific style based on context."""
-        if context.genre == "lo-fi":
-            return "jazzy chords, warm keys, vintage electric piano"
-        elif context.genre == "techno":
-            return "atmospheric pads, electronic textures"
-        elif context.genre == "jazz":
-            return "complex jazz chords, piano comping"
-        else:
-            return "chord progression"
+        return self._get_track_style("harmony", context.genre)
     
     def _get_melody_style(self, context: MusicContext) -> str:
         """Get melody-specific style based on context."""
-        if context.genre == "lo-fi":
-            return "subtle melody, atmospheric lead, vinyl texture"
-        elif context.genre == "techno":
-            return "electronic lead, synthesizer melody"
-        elif context.genre == "jazz":
-            return "improvised solo, melodic phrases"
-        else:
-            return "melodic line"
\ No newline at end of file
+        return self._get_track_style("melody", context.genre)
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""
+Streaming Decode - Hand audio to a sink while MusicGen is still generating
+
+MusicGen emits codebook tokens one step at a time. AudioStreamer collects
+them and, every `play_steps` steps, decodes the tokens so far with EnCodec
+and passes the newly finished samples to a callback, so writing (or
+playing) audio overlaps the rest of the generation. WavStreamWriter is a
+ready-made callback that appends the chunks to WAV files.
+"""
+
+import math
+import typing as tp
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import torch
+from transformers.generation.streamers import BaseStreamer
+
+from .track_session import _to_pcm16
+
+
+# on_audio(chunk, final): chunk is [batch, 1, samples] FP32 on CPU; final is
+# True for the last call of a generation
+AudioSink = tp.Callable[[torch.Tensor, bool], None]
+
+
+class AudioStreamer(BaseStreamer):
+    """
+    Streamer for `generate(streamer=...)` that decodes audio in chunks.
+
+    Decoding and the sink run on a background thread (with its own CUDA
+    stream), so the decoder keeps generating tokens meanwhile. Each decode
+    re-runs EnCodec over all tokens so far and holds back the last `stride`
+    samples, which can still change once more tokens arrive.
+    """
+
+    def __init__(self,
+                 model,
+                 on_audio: AudioSink,
+                 play_steps: int = 50,
+                 stride: tp.Optional[int] = None):
+        """
+        Initialize the streamer.
+
+        Args:
+            model: MusicgenForConditionalGeneration doing the generation
+            on_audio: Callback receiving each chunk of finished audio
+            play_steps: Decode every this many generated tokens (50 ≈ 1s)
+            stride: Samples held back per chunk (default: derived from play_steps)
+        """
+        self.decoder = model.decoder
+        self.audio_encoder = model.audio_encoder
+        self.num_codebooks = model.decoder.num_codebooks
+        self.start_token_id = model.generation_config.decoder_start_token_id
+        self.pad_token_id = model.generation_config.pad_token_id
+        self.device = next(self.audio_encoder.parameters()).device
+        self.on_audio = on_audio
+        self.play_steps = play_steps
+
+        if stride is None:
+            hop_length = math.prod(self.audio_encoder.config.upsampling_ratios)
+            stride = hop_length * max(play_steps - self.num_codebooks, 0) // 6
+        self.stride = stride
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resonantgen-stream-decode")
+        self._decode_stream = torch.cuda.Stream(device=self.device) if self.device.type == "cuda" else None
+        self._pending: tp.List[Future] = []
+        self._token_cache: tp.Optional[torch.Tensor] = None
+        self._emitted = 0  # Samples already handed to the sink
+        self._chunks: tp.List[torch.Tensor] = []  # Everything handed to the sink, in order
+
+    def put(self, value: torch.Tensor):
+        """Receive the next step's tokens [batch * num_codebooks] (or the start ids)."""
+        value = value.cpu()
+        if value.dim() == 1:
+            value = value[:, None]
+
+        if self._token_cache is None:
+            self._token_cache = value
+        else:
+            self._token_cache = torch.cat([self._token_cache, value], dim=-1)
+
+        if self._token_cache.shape[-1] % self.play_steps == 0:
+            self._pending.append(self._executor.submit(self._emit, self._token_cache, False))
+
+    def end(self):
+        """Flush the remaining audio and wait for the sink to finish."""
+        if self._token_cache is not None:
+            self._pending.append(self._executor.submit(self._emit, self._token_cache, True))
+
+        try:
+            for future in self._pending:
+                future.result()  # Surface decode or sink errors
+        finally:
+            self.close()
+
+    @property
+    def audio(self) -> torch.Tensor:
+        """
+        The samples handed to the sink, joined: [batch, 1, samples] FP32 on CPU.
+
+        Earlier chunks come from partial decodes, so this can differ slightly
+        from a single decode of the finished tokens; it is exactly what the
+        sink received.
+        """
+        return torch.cat(self._chunks, dim=-1)
+
+    def close(self):
+        """Drop queued decodes and stop the worker (end() does this; call it if generate fails)."""
+        self._pending = []
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _emit(self, token_ids: torch.Tensor, final: bool):
+        """Decode token_ids and pass the not-yet-emitted samples to the sink."""
+        audio = self._decode(token_ids)
+        if audio is None:
+            if final:
+                # Too short to decode: still tell the sink the generation is over
+                batch_size = token_ids.shape[0] // self.num_codebooks
+                empty = torch.zeros((batch_size, 1, 0), dtype=torch.float32)
+                self._chunks.append(empty)
+                self.on_audio(empty, True)
+            return
+
+        end = audio.shape[-1] if final else max(audio.shape[-1] - self.stride, self._emitted)
+        chunk = audio[..., self._emitted:end]
+        self._emitted = end
+
+        if chunk.shape[-1] > 0 or final:
+            self._chunks.append(chunk)
+            self.on_audio(chunk, final)
+
+    def _decode(self, token_ids: torch.Tensor) -> tp.Optional[torch.Tensor]:
+        """
+        Decode tokens generated so far to audio.
+
+        Args:
+            token_ids: Raw tokens [batch * num_codebooks, steps], delay pattern not yet applied
+
+        Returns:
+            Audio [batch, 1, samples] FP32 on CPU, or None if too few steps to decode
+        """
+        steps = token_ids.shape[-1]
+        if steps < 2 * self.num_codebooks - 1:
+            return None
+        batch_size = token_ids.shape[0] // self.num_codebooks
+
+        # Treat the window as the end of the sequence: the delay pattern then
+        # leaves every codebook with the same number of complete frames
+        _, delay_pattern_mask = self.decoder.build_delay_pattern_mask(
+            token_ids[:, :1],
+            pad_token_id=self.start_token_id,
+            max_length=steps
+        )
+        output_ids = self.decoder.apply_delay_pattern_mask(token_ids, delay_pattern_mask)
+        output_ids = output_ids[output_ids != self.pad_token_id].reshape(
+            batch_size, self.num_codebooks, -1
+        )
+
+        with torch.inference_mode(), torch.cuda.stream(self._decode_stream):
+            audio_values = self.audio_encoder.decode(
+                output_ids[None, ...].to(self.device),
+                audio_scales=[None] * batch_size
+            ).audio_values
+            # .cpu() waits for the decode stream only
+            return audio_values.float().cpu()
+
+
+class WavStreamWriter:
+    """
+    AudioStreamer sink that appends each batch row to its own 16-bit WAV file.
+
+    Files are opened on the first chunk and closed (header finalized) on the
+    final one.
+    """
+
+    def __init__(self, paths: tp.Sequence[str], sample_rate: int):
+        """
+        Initialize the writer.
+
+        Args:
+            paths: One output path per batch row
+            sample_rate: Sample rate in Hz
+        """
+        self.paths = [Path(path) for path in paths]
+        self.sample_rate = sample_rate
+        self._files: tp.Optional[tp.List[wave.Wave_write]] = None
+
+    def __call__(self, chunk: torch.Tensor, final: bool):
+        """Write a [batch, 1, samples] chunk."""
+        if self._files is None:
+            self._files = []
+            for path in self.paths:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                wav = wave.open(str(path), "wb")
+                wav.setnchannels(chunk.shape[1])
+                wav.setsampwidth(2)
+                wav.setframerate(self.sample_rate)
+                self._files.append(wav)
+
+        # Interleave channels as WAV frames
+        pcm = _to_pcm16(chunk).transpose(1, 2).contiguous().numpy()
+        for wav, samples in zip(self._files, pcm):
+            wav.writeframes(samples.tobytes())
+
+        if final:
+            self.close()
+
+    def close(self):
+        """Close any open files."""
+        for wav in self._files or []:
+            wav.close()
+        self._files = None
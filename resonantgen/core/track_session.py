@@ -5,36 +5,156 @@ Provides the core multi-track functionality that makes ResonantGen revolutionary
 """
 
 import typing as tp
-from dataclasses import dataclass, field
 import torch
-import torchaudio
+import logging
+import os
 import pickle
+import threading
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
+from ._mix import mix_stems
+
+
+logger = logging.getLogger(__name__)
+
+
+# Formats written as 16-bit integer PCM rather than 32-bit float
+PCM16_FORMATS = ("wav", "flac")
+
+# Full-scale int16 sample value
+PCM16_SCALE = 32767
+
+# Write buffer for exports: each file goes to disk in one large write
+EXPORT_BUFFER_SIZE = 1 << 20
+
+# Shared pool for background exports (created on first use)
+_export_executor: tp.Optional[ThreadPoolExecutor] = None
+
+
+def _get_export_executor() -> ThreadPoolExecutor:
+    """Get the shared export thread pool."""
+    global _export_executor
+    if _export_executor is None:
+        # One worker per stem, but no more than there are cores to encode on
+        _export_executor = ThreadPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            thread_name_prefix="resonantgen-export"
+        )
+    return _export_executor
+
+
+def _to_pcm16(data: torch.Tensor) -> torch.Tensor:
+    """Convert float audio in [-1, 1] to int16 samples."""
+    return (data.detach().to(torch.float32).clamp(-1.0, 1.0) * PCM16_SCALE).round().to(torch.int16).cpu()
+
+
+def _save_audio(filepath: Path, data: torch.Tensor, sample_rate: int, format: str):
+    """Save float or int16 audio, writing 16-bit PCM directly for formats that support it."""
+    import torchaudio  # Deferred: only exports need it, and it is slow to import
+    
+    format = format.lower()  # "song.WAV" is still 16-bit PCM
+    if format in PCM16_FORMATS:
+        if data.dtype != torch.int16:
+            data = _to_pcm16(data)
+        with open(filepath, "wb", buffering=EXPORT_BUFFER_SIZE) as f:
+            torchaudio.save(
+                f,
+                data,
+                sample_rate,
+                format=format,
+                encoding="PCM_S",
+                bits_per_sample=16
+            )
+    else:
+        if data.dtype == torch.int16:
+            data = data.to(torch.float32) / PCM16_SCALE
+        torchaudio.save(filepath, data.to(torch.float32).cpu(), sample_rate, format=format)
+
+
+def _rms_energy(stems: torch.Tensor) -> tp.List[float]:
+    """RMS energy of each int16 track in a [tracks, channels, samples] stack."""
+    audio = stems.to(torch.float32) / PCM16_SCALE
+    return torch.sqrt((audio * audio).mean(dim=(1, 2))).tolist()
+
 
-@dataclass
 class AudioTrack:
     """
     Represents a single audio track with metadata and locking capability.
     
     This is the core unit of ResonantGen's selective regeneration system.
+    Audio is held as 16-bit PCM (half the memory of float32 and written to
+    WAV as-is); `data` converts to float on access for mixing and analysis.
     """
-    data: torch.Tensor  # Audio data [1, samples]
-    sample_rate: int
-    duration: float
-    track_type: str  # "drums", "bass", "harmony", "melody"
-    metadata: tp.Dict[str, tp.Any] = field(default_factory=dict)
-    _locked: bool = field(default=False, init=False)
+    
+    # Sessions build (and regenerate) many tracks: no per-instance __dict__
+    __slots__ = ("_data_i16", "_rms", "sample_rate", "duration", "track_type", "metadata", "_locked")
+    
+    def __init__(self,
+                 data: torch.Tensor,
+                 sample_rate: int,
+                 duration: float,
+                 track_type: str,
+                 metadata: tp.Optional[tp.Dict[str, tp.Any]] = None):
+        """
+        Initialize an audio track.
+        
+        Args:
+            data: Audio data [1, samples], float in [-1, 1] (or int16 PCM)
+            sample_rate: Sample rate in Hz
+            duration: Duration in seconds
+            track_type: "drums", "bass", "harmony", "melody"
+            metadata: Generation metadata
+        """
+        self.data = data
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self.track_type = track_type
+        self.metadata = metadata if metadata is not None else {}
+        self._locked = False
+    
+    @property
+    def data(self) -> torch.Tensor:
+        """Audio data [1, samples] as float32 in [-1, 1]."""
+        return self._data_i16.to(torch.float32) / PCM16_SCALE
+    
+    @data.setter
+    def data(self, value: torch.Tensor):
+        self._data_i16 = value.cpu() if value.dtype == torch.int16 else _to_pcm16(value)
+        self._rms = None  # Recomputed on next access
+    
+    @property
+    def rms(self) -> float:
+        """RMS energy of the audio (computed once, cached until data changes)."""
+        if self._rms is None:
+            self._rms = _rms_energy(self._data_i16[None])[0]
+        return self._rms
+    
+    def __getstate__(self) -> tp.Dict[str, tp.Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __setstate__(self, state: tp.Dict[str, tp.Any]):
+        # Sessions pickled before tracks stored int16 hold float `data`
+        if "data" in state:
+            state["_data_i16"] = _to_pcm16(state.pop("data"))
+        state.setdefault("_rms", None)
+        for name, value in state.items():
+            setattr(self, name, value)
+    
+    def __repr__(self) -> str:
+        return (f"AudioTrack(track_type={self.track_type!r}, duration={self.duration:.1f}, "
+                f"sample_rate={self.sample_rate}, locked={self._locked})")
     
     def lock(self):
         """Lock this track to prevent regeneration."""
         self._locked = True
-        print(f"🔒 {self.track_type.capitalize()} track locked")
+        logger.debug("🔒 %s track locked", self.track_type.capitalize())
     
     def unlock(self):
         """Unlock this track to allow regeneration."""
         self._locked = False
-        print(f"🔓 {self.track_type.capitalize()} track unlocked")
+        logger.debug("🔓 %s track unlocked", self.track_type.capitalize())
     
     @property
     def is_locked(self) -> bool:
@@ -49,14 +169,26 @@ class AudioTrack:
     def export(self, filepath: str):
         """Export this track to audio file."""
         filepath = Path(filepath)
-        torchaudio.save(
-            filepath, 
-            self.data, 
+        suffix = filepath.suffix
+        _save_audio(
+            filepath,
+            self._data_i16,
             self.sample_rate,
-            format=filepath.suffix[1:] if filepath.suffix else "wav"
+            format=suffix[1:] or "wav"
         )
         print(f"💾 Exported {self.track_type} to {filepath}")
     
+    def export_async(self, filepath: str) -> Future:
+        """
+        Export this track in a background thread.
+        
+        Lets WAV encoding and disk I/O overlap with the next generation.
+        
+        Returns:
+            Future that completes when the file is written
+        """
+        return _get_export_executor().submit(self.export, filepath)
+    
     def get_features(self) -> tp.Dict[str, tp.Any]:
         """Extract musical features from this track for context."""
         # TODO: Implement actual feature extraction
@@ -66,7 +198,7 @@ class AudioTrack:
             "duration": self.duration,
             "sample_rate": self.sample_rate,
             "locked": self._locked,
-            "rms_energy": torch.sqrt(torch.mean(self.data ** 2)).item(),
+            "rms_energy": self.rms,
             "metadata": self.metadata
         }
 
@@ -96,9 +228,52 @@ class TrackSession:
         self.context = context or {}
         self.duration = max((track.duration for track in self.tracks.values()), default=0.0)
         
+        # All tracks' samples in one int16 [tracks, channels, samples] buffer
+        # that the tracks are views of; see stems()
+        self._stems: tp.Optional[torch.Tensor] = None
+        
+        # (the stems it was mixed from, mix); see mix()
+        self._mix_cache: tp.Optional[tp.Tuple[tp.Tuple[torch.Tensor, ...], torch.Tensor]] = None
+        
         # Track names expected in ResonantGen
         self.track_types = ["drums", "bass", "harmony", "melody"]
     
+    @classmethod
+    def from_stems(cls,
+                   stems: torch.Tensor,
+                   sample_rate: int,
+                   duration: float,
+                   track_metadata: tp.Dict[str, tp.Dict[str, tp.Any]],
+                   original_prompt: str = "",
+                   context: tp.Dict[str, tp.Any] = None) -> 'TrackSession':
+        """
+        Create a session whose tracks are views of one stacked buffer.
+        
+        Args:
+            stems: Audio [tracks, channels, samples], float in [-1, 1] or int16
+            sample_rate: Sample rate in Hz
+            duration: Duration in seconds
+            track_metadata: track_name -> generation metadata, in stem order
+            original_prompt: The original generation prompt
+            context: Musical context information
+        """
+        if stems.dtype != torch.int16:
+            stems = _to_pcm16(stems)
+        
+        tracks = {
+            track_name: AudioTrack(
+                data=stem,
+                sample_rate=sample_rate,
+                duration=duration,
+                track_type=track_name,
+                metadata=metadata
+            )
+            for (track_name, metadata), stem in zip(track_metadata.items(), stems.unbind(0))
+        }
+        session = cls(tracks=tracks, original_prompt=original_prompt, context=context)
+        session._stems = stems
+        return session
+    
     def __getitem__(self, track_name: str) -> AudioTrack:
         """Get a track by name."""
         if track_name not in self.tracks:
@@ -108,7 +283,8 @@ class TrackSession:
     def __setitem__(self, track_name: str, track: AudioTrack):
         """Set a track by name."""
         self.tracks[track_name] = track
-        print(f"✅ Updated {track_name} track")
+        self.duration = max(track.duration for track in self.tracks.values())  # Stays current after replacements
+        logger.debug("✅ Updated %s track", track_name)
     
     def lock(self, track_name: str):
         """Lock a specific track."""
@@ -132,6 +308,8 @@ class TrackSession:
         if not locked_tracks:
             return {}
         
+        self._compute_rms_batch(locked_tracks.values())
+        
         context = {
             "locked_track_names": list(locked_tracks.keys()),
             "locked_features": {}
@@ -142,6 +320,18 @@ class TrackSession:
         
         return context
     
+    def _compute_rms_batch(self, tracks: tp.Iterable[AudioTrack]):
+        """Fill in the cached RMS of tracks that lack it, in one reduction per track length."""
+        by_shape: tp.Dict[torch.Size, tp.List[AudioTrack]] = {}
+        for track in tracks:
+            if track._rms is None:
+                by_shape.setdefault(track._data_i16.shape, []).append(track)
+        
+        for group in by_shape.values():
+            values = _rms_energy(torch.stack([track._data_i16 for track in group]))
+            for track, value in zip(group, values):
+                track._rms = value
+    
     def update_track(self, track_name: str, new_track: AudioTrack):
         """Update a track with regenerated version."""
         if track_name in self.tracks and self.tracks[track_name].is_locked:
@@ -149,6 +339,52 @@ class TrackSession:
         
         self[track_name] = new_track
     
+    @torch.no_grad()
+    def mix(self) -> torch.Tensor:
+        """
+        Mix all tracks (equal-weight average) into one float [1, samples] tensor.
+        
+        The mix is cached until a track is replaced, so exporting the same
+        session repeatedly doesn't remix it.
+        """
+        stems = self.stems()
+        key = tuple(track._data_i16 for track in self.tracks.values())
+        if self._mix_cache is not None and len(self._mix_cache[0]) == len(key) and all(
+            cached is stem for cached, stem in zip(self._mix_cache[0], key)
+        ):
+            return self._mix_cache[1]
+        
+        # Average the int16 stems in one pass, with the int16 -> [-1, 1] scale
+        # folded into the weights instead of converting the stack first
+        n_stems = stems.shape[0]
+        mixed = mix_stems(stems, torch.full((n_stems,), 1.0 / (n_stems * PCM16_SCALE)))
+        self._mix_cache = (key, mixed)
+        return mixed
+    
+    def stems(self) -> torch.Tensor:
+        """
+        All tracks as one int16 [tracks, channels, samples] tensor.
+        
+        Sessions from from_stems() already hold their tracks in one buffer, so
+        this is free. After a track is replaced the tracks are packed into a
+        new buffer once (and become views of it again).
+        """
+        tracks = list(self.tracks.values())
+        if self._stems is not None and len(tracks) == self._stems.shape[0] and all(
+            track._data_i16.data_ptr() == row.data_ptr() and track._data_i16.shape == row.shape
+            for track, row in zip(tracks, self._stems)
+        ):
+            return self._stems
+        
+        self._stems = torch.stack([track._data_i16 for track in tracks])
+        for track, row in zip(tracks, self._stems.unbind(0)):
+            track._data_i16 = row  # Same samples; keeps the cached RMS
+        return self._stems
+    
+    def set_mix(self, mixed: torch.Tensor):
+        """Seed the mix() cache with a mix of the current tracks (e.g. made before quantization)."""
+        self._mix_cache = (tuple(track._data_i16 for track in self.tracks.values()), mixed)
+    
     def play(self):
         """Play all tracks mixed together."""
         print(f"🎵 Playing session: '{self.original_prompt}'")
@@ -159,6 +395,7 @@ class TrackSession:
         # TODO: Implement actual mixed playback
         print("   (Audio playback not implemented yet)")
     
+    @torch.no_grad()
     def export(self, 
                filepath: str, 
                format: str = "wav",
@@ -169,54 +406,122 @@ class TrackSession:
         Args:
             filepath: Base filepath for export
             format: Audio format ("wav", "mp3", etc.)
-            stems: If True, export individual stems
+            stems: If True, also export individual stems to <name>_stems/
         """
+        if not self.tracks:
+            raise ValueError("Session has no tracks to export")
+        
         filepath = Path(filepath)
+        output_path = filepath.with_suffix(f".{format}")
         
         if stems:
             # Export individual tracks
             stem_dir = filepath.parent / f"{filepath.stem}_stems"
-            stem_dir.mkdir(exist_ok=True)
-            
-            for name, track in self.tracks.items():
-                stem_path = stem_dir / f"{name}.{format}"
-                track.export(stem_path)
-            
+            self.export_tracks(stem_dir, format)
             print(f"💾 Exported stems to {stem_dir}/")
         
-        # Export mixed version
-        if len(self.tracks) > 1:
-            # Simple mixing - just sum the tracks
-            mixed_audio = sum(track.data for track in self.tracks.values())
-            mixed_audio = mixed_audio / len(self.tracks)  # Normalize
+        first_track = next(iter(self.tracks.values()))
+        if len(self.tracks) == 1:
+            # Single track - just export it, no mixing
+            first_track.export(output_path)
+            return
+        
+        # Export mixed version - average of the tracks, cached on the session
+        _save_audio(output_path, self.mix(), first_track.sample_rate, format)
+        print(f"💾 Exported mixed track to {output_path}")
+    
+    def export_tracks(self, directory: str, format: str = "wav") -> tp.Dict[str, Path]:
+        """
+        Export every track to `<directory>/<track name>.<format>`.
+        
+        Writes are I/O-bound, so the files are written concurrently on the
+        shared export pool; returns once all of them are on disk.
+        
+        Args:
+            directory: Output directory (created if missing)
+            format: Audio format ("wav", "mp3", etc.)
             
-            sample_rate = next(iter(self.tracks.values())).sample_rate
-            torchaudio.save(filepath.with_suffix(f".{format}"), mixed_audio, sample_rate)
-            print(f"💾 Exported mixed track to {filepath.with_suffix(f'.{format}')}")
-        else:
-            # Single track - just export it
-            track = next(iter(self.tracks.values()))
-            track.export(filepath.with_suffix(f".{format}"))
+        Returns:
+            Dictionary of track_name -> written path
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        
+        paths = {name: directory / f"{name}.{format}" for name in self.tracks}
+        
+        # Already on an export worker (export_async): waiting on the same pool
+        # could deadlock it, so write in this thread
+        if threading.current_thread().name.startswith("resonantgen-export"):
+            for name, track in self.tracks.items():
+                track.export(paths[name])
+            return paths
+        
+        executor = _get_export_executor()
+        futures = [executor.submit(track.export, paths[name]) for name, track in self.tracks.items()]
+        for future in futures:
+            future.result()  # Surface any write errors
+        
+        return paths
+    
+    def export_async(self, 
+                     filepath: str, 
+                     format: str = "wav",
+                     stems: bool = False) -> Future:
+        """
+        Export the session in a background thread (see export()).
+        
+        Returns:
+            Future that completes when all files are written
+        """
+        return _get_export_executor().submit(self.export, filepath, format, stems)
     
     def save(self, filepath: str):
         """Save session to file for later loading."""
-        with open(filepath, 'wb') as f:
-            pickle.dump({
-                'tracks': self.tracks,
-                'original_prompt': self.original_prompt,
-                'context': self.context,
-                'duration': self.duration
-            }, f)
+        # torch.save writes the int16 sample buffers straight from their storage
+        # (zip format) rather than pickling them through Python objects
+        torch.save({
+            'tracks_data': {
+                name: {
+                    'data': track._data_i16.contiguous(),
+                    'sample_rate': track.sample_rate,
+                    'duration': track.duration,
+                    'track_type': track.track_type,
+                    'metadata': track.metadata,
+                    'locked': track.is_locked
+                }
+                for name, track in self.tracks.items()
+            },
+            'original_prompt': self.original_prompt,
+            'context': self.context,
+            'duration': self.duration
+        }, filepath)
         print(f"💾 Session saved to {filepath}")
     
     @classmethod
     def load(cls, filepath: str) -> 'TrackSession':
         """Load session from file."""
-        with open(filepath, 'rb') as f:
-            data = pickle.load(f)
+        if zipfile.is_zipfile(filepath):
+            # Context/metadata hold MusicContext objects, so this isn't weights-only
+            data = torch.load(filepath, weights_only=False)
+            tracks = {}
+            for name, fields in data['tracks_data'].items():
+                track = AudioTrack(
+                    data=fields['data'],
+                    sample_rate=fields['sample_rate'],
+                    duration=fields['duration'],
+                    track_type=fields['track_type'],
+                    metadata=fields['metadata']
+                )
+                track._locked = fields['locked']
+                tracks[name] = track
+        else:
+            # Sessions saved before torch.save was used are plain pickles
+            with open(filepath, 'rb') as f:
+                data = pickle.load(f)
+            tracks = data['tracks']
         
         session = cls(
-            tracks=data['tracks'],
+            tracks=tracks,
             original_prompt=data['original_prompt'],
             context=data['context']
         )
@@ -6,12 +6,15 @@ music generation interface with selective regeneration capabilities.
 """
 
 import typing as tp
+from pathlib import Path
 from dataclasses import dataclass
 import torch
 
 from .musicgen_engine import MusicGenEngine
-from .track_session import TrackSession, AudioTrack
+from .track_session import TrackSession, AudioTrack, _to_pcm16
 from .prompt_processor import PromptProcessor
+from .streaming import WavStreamWriter
+from ._mix import mix_stems
 
 
 @dataclass
@@ -44,16 +47,49 @@ class MusicWorkstation:
         >>> tracks.export("my_track.wav")
     """
     
-    def __init__(self, model_size: str = "small", device: str = "auto"):
+    def __init__(self, 
+                 model_size: str = "small", 
+                 device: str = "auto", 
+                 use_cache: bool = False,
+                 backend: str = "torch",
+                 quantize: tp.Optional[str] = None,
+                 precision: tp.Optional[str] = None,
+                 compile: bool = False):
         """
         Initialize the Music Workstation.
         
         Args:
             model_size: Size of MusicGen model ("small", "medium", "large")
             device: Device to run on ("cuda", "cpu", "auto")
+            use_cache: Reuse audio from the on-disk cache for identical requests
+            backend: Decoder backend ("torch", or "onnx" for ONNX Runtime)
+            quantize: Decoder weight quantization for the torch backend (None or "int8")
+            precision: Torch backend precision ("fp16", "bf16", "fp32"; default
+                FP16 on CUDA, FP32 on CPU)
+            compile: torch.compile the decoder into CUDA graphs (torch backend,
+                CUDA only); compiles and warms up at load, so it pays off for
+                long-running sessions
         """
         self.device = self._setup_device(device)
-        self.engine = MusicGenEngine(model_size=model_size, device=self.device)
+        if backend == "onnx":
+            torch_only = {"quantize": quantize, "precision": precision, "compile": compile}
+            unsupported = [name for name, value in torch_only.items() if value]
+            if unsupported:
+                raise ValueError(f"{', '.join(unsupported)} only apply to the torch backend, not backend='onnx'")
+            # Imported lazily - onnxruntime is an optional dependency
+            from .onnx_engine import OnnxMusicGenEngine
+            self.engine = OnnxMusicGenEngine(model_size=model_size, device=self.device, use_cache=use_cache)
+        elif backend == "torch":
+            self.engine = MusicGenEngine(
+                model_size=model_size,
+                device=self.device,
+                use_cache=use_cache,
+                quantize=quantize,
+                precision=precision,
+                compile_decoder=compile
+            )
+        else:
+            raise ValueError(f"Unknown backend '{backend}'. Available: ['torch', 'onnx']")
         self.prompt_processor = PromptProcessor()
         self.current_session: tp.Optional[TrackSession] = None
         
@@ -63,13 +99,20 @@ class MusicWorkstation:
             return torch.device("cuda" if torch.cuda.is_available() else "cpu")
         return torch.device(device)
     
-    def generate(self, prompt: str, duration: float = 8.0, **kwargs) -> TrackSession:
+    def generate(self, 
+                 prompt: str, 
+                 duration: float = 8.0, 
+                 seed: tp.Optional[int] = None, 
+                 stream_to: tp.Optional[str] = None, 
+                 **kwargs) -> TrackSession:
         """
         Generate a multi-track composition from natural language prompt.
         
         Args:
             prompt: Natural language description of the music
             duration: Duration in seconds
+            seed: Seed for reproducible sampling (None = random)
+            stream_to: Directory to write <track>.wav into while generating
             **kwargs: Additional generation parameters
             
         Returns:
@@ -80,45 +123,128 @@ class MusicWorkstation:
         """
         request = GenerationRequest(prompt=prompt, duration=duration, **kwargs)
         
-        # Process the prompt to understand musical intent
-        music_context = self.prompt_processor.analyze(prompt)
+        return self.generate_many(
+            [prompt], 
+            duration, 
+            seed=seed, 
+            stream_to=[stream_to] if stream_to is not None else None
+        )[0]
+    
+    def generate_many(self, 
+                      prompts: tp.List[str], 
+                      duration: float = 8.0, 
+                      seed: tp.Optional[int] = None, 
+                      stream_to: tp.Optional[tp.List[str]] = None) -> tp.List[TrackSession]:
+        """
+        Generate several multi-track compositions in one batched MusicGen call.
         
-        # Generate tracks using context-aware prompting
-        track_prompts = self.prompt_processor.create_track_prompts(music_context)
+        Every track of every prompt goes into the same batch (4 tracks x N
+        prompts), which keeps the GPU busy instead of decoding one prompt at a time.
         
-        generated_tracks = {}
-        for track_name, track_prompt in track_prompts.items():
-            print(f"Generating {track_name}...")
-            audio_data = self.engine.generate(track_prompt, duration)
+        Args:
+            prompts: Natural language descriptions of the music
+            duration: Duration in seconds (shared by all prompts)
+            seed: Seed for reproducible sampling (None = random)
+            stream_to: One directory per prompt to write <track>.wav files into
+                as the audio decodes, overlapping the export with generation
+            
+        Returns:
+            One TrackSession per prompt; the last becomes the current session
             
-            generated_tracks[track_name] = AudioTrack(
-                data=audio_data,
+        Example:
+            >>> sessions = maw.generate_many(["upbeat pop at 120 BPM", "smooth jazz at 90 BPM"])
+        """
+        # Process the prompts to understand musical intent
+        music_contexts = [self.prompt_processor.analyze(prompt) for prompt in prompts]
+        
+        # Generate tracks using context-aware prompting
+        all_track_prompts = [
+            self.prompt_processor.create_track_prompts(music_context)
+            for music_context in music_contexts
+        ]
+        
+        # Generate all tracks in one batched MusicGen call instead of one call per track
+        print(f"Generating {', '.join(all_track_prompts[0])}"
+              + (f" for {len(prompts)} prompts..." if len(prompts) > 1 else "..."))
+        seed_kwargs = {"seed": seed} if seed is not None else {}
+        flat_prompts = [track_prompt for track_prompts in all_track_prompts for track_prompt in track_prompts.values()]
+        if stream_to is None:
+            audio_batch = self.engine.generate_batch(flat_prompts, duration, **seed_kwargs)
+        else:
+            writer = WavStreamWriter(
+                [
+                    Path(directory) / f"{track_name}.wav"
+                    for directory, track_prompts in zip(stream_to, all_track_prompts)
+                    for track_name in track_prompts
+                ],
+                self.engine.sample_rate
+            )
+            audio_batch = self.engine.generate_stream(flat_prompts, writer, duration, **seed_kwargs)
+        
+        # Quantize every track to int16 in one pass over the stacked batch;
+        # each session keeps its [tracks, 1, samples] slice as its stem buffer
+        stacked = torch.stack(audio_batch)
+        pcm = _to_pcm16(stacked)
+        
+        sessions = []
+        offset = 0
+        for prompt, music_context, track_prompts in zip(prompts, music_contexts, all_track_prompts):
+            n_tracks = len(track_prompts)
+            session = TrackSession.from_stems(
+                pcm[offset:offset + n_tracks],
                 sample_rate=self.engine.sample_rate,
                 duration=duration,
-                track_type=track_name,
-                metadata={
-                    "prompt": track_prompt,
-                    "original_request": prompt,
-                    "generation_context": music_context
-                }
+                track_metadata={
+                    track_name: {
+                        "prompt": track_prompt,
+                        "original_request": prompt,
+                        "generation_context": music_context
+                    }
+                    for track_name, track_prompt in track_prompts.items()
+                },
+                original_prompt=prompt,
+                context=music_context
             )
+            
+            # Mix now, from the float batch, so exporting the mix later is just a write
+            if n_tracks > 1:
+                session.set_mix(mix_stems(stacked[offset:offset + n_tracks]))
+            offset += n_tracks
+            sessions.append(session)
         
-        # Create session
-        self.current_session = TrackSession(
-            tracks=generated_tracks,
-            original_prompt=prompt,
-            context=music_context
-        )
+        self.current_session = sessions[-1]
+        return sessions
+    
+    def prefetch(self, prompt: str):
+        """
+        Start encoding the track prompts for a later generate(prompt) in the background.
         
-        return self.current_session
+        Args:
+            prompt: Natural language description of the music
+            
+        Returns:
+            Future that completes when the prompts are encoded
+            
+        Example:
+            >>> maw.prefetch(next_prompt)   # Encodes while the current one decodes
+            >>> tracks = maw.generate(prompt)
+        """
+        music_context = self.prompt_processor.analyze(prompt)
+        track_prompts = self.prompt_processor.create_track_prompts(music_context)
+        return self.engine.prefetch(list(track_prompts.values()))
     
-    def regenerate(self, track_name: str, new_prompt: str, **kwargs) -> AudioTrack:
+    def regenerate(self, 
+                   track_name: str, 
+                   new_prompt: str, 
+                   seed: tp.Optional[int] = None, 
+                   **kwargs) -> AudioTrack:
         """
         Regenerate a specific track with new prompt while respecting locked tracks.
         
         Args:
             track_name: Name of track to regenerate ("drums", "bass", "harmony", "melody")
             new_prompt: New description for this track
+            seed: Seed for reproducible sampling (None = random)
             **kwargs: Additional parameters
             
         Returns:
@@ -142,7 +268,8 @@ class MusicWorkstation:
         )
         
         # Generate new track
-        audio_data = self.engine.generate(full_prompt, self.current_session.duration)
+        seed_kwargs = {"seed": seed} if seed is not None else {}
+        audio_data = self.engine.generate(full_prompt, self.current_session.duration, **seed_kwargs)
         
         new_track = AudioTrack(
             data=audio_data,
@@ -185,4 +312,53 @@ class MusicWorkstation:
     def load_session(self, filepath: str) -> TrackSession:
         """Load a session from file."""
         self.current_session = TrackSession.load(filepath)
-        return self.current_session
\ No newline at end of file
+        return self.current_session
+
+
+# Shared workstations keyed by configuration, so repeated use in one process
+# loads MusicGen only once
+_WORKSTATIONS: tp.Dict[tp.Tuple[str, str, bool, str, tp.Optional[str], tp.Optional[str], bool], MusicWorkstation] = {}
+
+
+def get_workstation(model_size: str = "small", 
+                    device: str = "auto", 
+                    use_cache: bool = False,
+                    backend: str = "torch",
+                    quantize: tp.Optional[str] = None,
+                    precision: tp.Optional[str] = None,
+                    compile: bool = False) -> MusicWorkstation:
+    """
+    Get a shared MusicWorkstation, creating it on first use.
+    
+    The workstation (and its current session) is shared by every caller that
+    asks for the same configuration.
+    
+    Args:
+        model_size: Size of MusicGen model ("small", "medium", "large")
+        device: Device to run on ("cuda", "cpu", "auto")
+        use_cache: Reuse audio from the on-disk cache for identical requests
+        backend: Decoder backend ("torch", or "onnx" for ONNX Runtime)
+        quantize: Decoder weight quantization for the torch backend (None or "int8")
+        precision: Torch backend precision ("fp16", "bf16", "fp32")
+        compile: torch.compile the decoder into CUDA graphs (torch backend, CUDA only)
+        
+    Returns:
+        The shared MusicWorkstation for this configuration
+        
+    Example:
+        >>> maw = get_workstation("small")
+        >>> maw is get_workstation("small")
+        True
+    """
+    key = (model_size, device, use_cache, backend, quantize, precision, compile)
+    if key not in _WORKSTATIONS:
+        _WORKSTATIONS[key] = MusicWorkstation(
+            model_size=model_size,
+            device=device,
+            use_cache=use_cache,
+            backend=backend,
+            quantize=quantize,
+            precision=precision,
+            compile=compile
+        )
+    return _WORKSTATIONS[key]
@@ -0,0 +1,27 @@
+"""
+Utilities - Small helpers shared by the ResonantGen scripts
+"""
+
+import json
+import typing as tp
+from pathlib import Path
+
+try:
+    import orjson  # Faster, writes bytes directly
+except ImportError:  # Optional dependency
+    orjson = None
+
+
+def write_json(path: tp.Union[str, Path], data: tp.Any):
+    """
+    Write data as indented JSON (orjson when installed, json otherwise).
+
+    Args:
+        path: Output file
+        data: JSON-serializable data
+    """
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
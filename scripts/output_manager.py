@@ -3,6 +3,7 @@
 
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -32,11 +33,45 @@ def list_sessions():
         print("No sessions found.")
         return
     
-    sessions = sorted(sessions_dir.glob("session_*"))
+    # One scandir per directory instead of glob's pattern matching per entry
+    with os.scandir(sessions_dir) as entries:
+        sessions = sorted(
+            (entry for entry in entries if entry.name.startswith("session_") and entry.is_dir()),
+            key=lambda entry: entry.name
+        )
     print(f"Found {len(sessions)} sessions:")
     for session in sessions:
-        wav_files = list(session.glob("*.wav"))
-        print(f"  {session.name} ({len(wav_files)} files)")
+        print(f"  {session.name} ({len(_wav_files(session.path))} files)")
+
+def _wav_files(directory) -> list:
+    """Paths of the .wav files directly inside directory."""
+    with os.scandir(directory) as entries:
+        return [entry.path for entry in entries if entry.name.endswith(".wav") and entry.is_file()]
+
+def _fast_copy(src: str, dst: str):
+    """
+    Copy a file (data + timestamps/permissions) without a user-space buffer.
+    
+    os.copy_file_range copies inside the kernel, which is a reflink (O(1))
+    on btrfs/XFS; it falls back to shutil.copyfile (sendfile on Linux).
+    """
+    copy_file_range = getattr(os, "copy_file_range", None)  # Linux, Python 3.8+
+    copied = False
+    if copy_file_range is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    n = copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if n == 0:
+                        break
+                    remaining -= n
+                copied = remaining == 0
+        except OSError:
+            copied = False  # e.g. cross-filesystem on older kernels
+    if not copied:
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
 
 def clean_temp():
     """Clean temporary files."""
@@ -56,9 +91,13 @@ def export_session(session_name: str, export_name: str):
     export_dir = Path(f"outputs/exports/{export_name}")
     export_dir.mkdir(parents=True, exist_ok=True)
     
-    # Copy all wav files
-    for wav_file in session_dir.glob("*.wav"):
-        shutil.copy2(wav_file, export_dir)
+    # Copy all wav files (concurrently - each copy is I/O-bound)
+    wav_files = _wav_files(session_dir)
+    with ThreadPoolExecutor(max_workers=min(8, len(wav_files) or 1)) as executor:
+        list(executor.map(
+            lambda wav_file: _fast_copy(wav_file, os.path.join(export_dir, os.path.basename(wav_file))),
+            wav_files
+        ))
     
     print(f"✅ Exported {session_name} to exports/{export_name}")
 
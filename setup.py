@@ -50,6 +50,15 @@ setup(
         "performance": [
             "xformers>=0.0.20",
             "flash-attn>=2.0.0",
+            "numba>=0.57.0",
+            "torchao>=0.5.0",
+            "orjson>=3.9.0",
+            "pyahocorasick>=2.0.0",
+            "accelerate>=0.26.0",
+        ],
+        "onnx": [
+            "onnxruntime-gpu>=1.16.0",
+            "onnx>=1.14.0",
         ],
     },
     entry_points={
@@ -62,33 +62,18 @@ def test_better_musicgen():
         }
     ]
     
-    for track_info in test_tracks:
-        print(f"\n🎼 Generating: {track_info['name']}")
+    # One batched generation for every track (generate_multi groups them by duration)
+    print(f"\n🎼 Generating {len(test_tracks)} tracks in one batch...")
+    audio_batch = engine.generate_multi(
+        [track_info['prompt'] for track_info in test_tracks],
+        [track_info['duration'] for track_info in test_tracks],
+        **best_config
+    )
+    
+    for track_info, audio in zip(test_tracks, audio_batch):
+        print(f"\n🎼 Generated: {track_info['name']}")
         print(f"   Prompt: {track_info['prompt']}")
         
-        # Process prompt
-        inputs = engine.processor(
-            text=[track_info['prompt']],
-            padding=True,
-            return_tensors="pt"
-        ).to(engine.device)
-        
-        # Generate with optimized parameters
-        tokens_needed = int(track_info['duration'] * 32)
-        
-        with torch.no_grad():
-            audio_values = engine.model.generate(
-                **inputs,
-                max_new_tokens=tokens_needed,
-                guidance_scale=best_config['guidance_scale'],
-                temperature=best_config['temperature'],
-                do_sample=best_config['do_sample'],
-                top_k=best_config['top_k'],
-                top_p=best_config['top_p']
-            )
-        
-        audio = audio_values[0].cpu()
-        
         # Create track and save
         track = AudioTrack(
             data=audio,
@@ -116,17 +101,17 @@ def test_better_musicgen():
         return_tensors="pt"
     ).to(engine.device)
     
-    with torch.no_grad():
+    with torch.inference_mode():
         bad_audio = engine.model.generate(
             **inputs,
-            max_new_tokens=128,  # 4 seconds
+            max_new_tokens=engine.tokens_for_duration(4.0),
             guidance_scale=3.0,
             temperature=1.0,
             do_sample=True
         )
     
     bad_track = AudioTrack(
-        data=bad_audio[0].cpu(),
+        data=bad_audio[0],  # Quantized to int16 on device, then copied once
         sample_rate=engine.sample_rate,
         duration=bad_audio[0].shape[1] / engine.sample_rate,
         track_type="bad_params"
@@ -135,10 +120,10 @@ def test_better_musicgen():
     
     # Good parameters
     print("✅ Good parameters (guidance=1.5, temp=1.2):")
-    with torch.no_grad():
+    with torch.inference_mode():
         good_audio = engine.model.generate(
             **inputs,
-            max_new_tokens=128,  # 4 seconds
+            max_new_tokens=engine.tokens_for_duration(4.0),
             guidance_scale=1.5,
             temperature=1.2,
             do_sample=True,
@@ -147,7 +132,7 @@ def test_better_musicgen():
         )
     
     good_track = AudioTrack(
-        data=good_audio[0].cpu(),
+        data=good_audio[0],
         sample_rate=engine.sample_rate,
         duration=good_audio[0].shape[1] / engine.sample_rate,
         track_type="good_params"
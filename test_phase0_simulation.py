@@ -3,156 +3,276 @@
 Phase 0 CLI Simulation - Test Jordan's workflow without model dependencies
 """
 
+import logging
+import logging.handlers
+import sys
+import threading
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Status output: buffered, and written out at the end of each phase
+logger = logging.getLogger("resonantgen.simulation")
+
+def _configure_output():
+    """Route status output to stdout through a MemoryHandler (once per process)."""
+    if logger.handlers:
+        return
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(logging.handlers.MemoryHandler(capacity=64, flushLevel=logging.ERROR, target=stream))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+def _flush_output():
+    """Write out the buffered status output."""
+    for handler in logger.handlers:
+        handler.flush()
+
+# Folder that every session is written under
+LOOPS_DIR = Path("loops")
+
+# Tracks in every session and the file each one exports to
+TRACK_NAMES = ("drums", "bass", "harmony", "melody")
+TRACK_FILENAMES = {track_name: f"{track_name}.wav" for track_name in TRACK_NAMES}
+
 class MockTrack:
     """Simulated audio track."""
+    # Export file template, filled from the instance attributes
+    _format_payload = "Mock {name} audio file\nDuration: {duration}s\nLocked: {locked}".format_map
+    
     def __init__(self, name, duration=8.0):
         self.name = name
         self.duration = duration
         self.locked = False
         self.data = f"[Mock {name} audio data]"
+        self._payload = None  # Encoded file contents, built on first export
+        self.last_payload = None  # Contents of the most recent export
     
     def lock(self):
         self.locked = True
+        self._payload = None  # The file records the lock state
+        
+    @property
+    def payload(self):
+        """File contents as bytes, rebuilt only after the track changes."""
+        if self._payload is None:
+            self._payload = MockTrack._format_payload(self.__dict__).encode()
+        return self._payload
         
     def export(self, path):
-        Path(path).write_text(f"Mock {self.name} audio file\nDuration: {self.duration}s\nLocked: {self.locked}")
+        """Write the cached payload straight to the file descriptor, no file object."""
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            self.last_payload = self.payload
+            view = memoryview(self.last_payload)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+class Session:
+    """The four tracks of a simulated session, one attribute per track."""
+    __slots__ = TRACK_NAMES
+    
+    def __init__(self, drums, bass, harmony, melody):
+        self.drums = drums
+        self.bass = bass
+        self.harmony = harmony
+        self.melody = melody
+        
+    def items(self):
+        """(track_name, track) pairs in TRACK_NAMES order."""
+        return [(track_name, getattr(self, track_name)) for track_name in TRACK_NAMES]
 
 class SimulatedCLI:
     """Simulated Phase 0 CLI to test workflow timing."""
     
-    def __init__(self):
+    def __init__(self, simulate_delays=None):
+        """
+        Args:
+            simulate_delays: Sleep to stand in for model time (default: on,
+                unless the RG_SIMULATE_DELAYS environment variable is "0")
+        """
+        if simulate_delays is None:
+            simulate_delays = os.environ.get("RG_SIMULATE_DELAYS", "1") != "0"
+        self._sleep = time.sleep if simulate_delays else (lambda _seconds: None)
+        
         self.session = None
         self.session_counter = 1
-        self.start_time = time.time()
+        self._session_name = None  # Set by prompt() for the session being worked on
+        self._session_path = None
+        self._session_lock = threading.Lock()  # lock() and regenerate() may run concurrently
+        self._created_sessions = set()  # Session folders known to exist
+        # Path -> (name, duration, locked) last written there by this process.
+        # In memory only: every run reuses loops/session_01 and writes all of
+        # its tracks afresh from prompt(), so the cache only saves rewrites
+        # within a run, and a file changed on disk meanwhile isn't noticed
+        self._export_cache = {}
+        LOOPS_DIR.mkdir(exist_ok=True)
+        self._start_ns = time.monotonic_ns()  # Monotonic: immune to wall-clock jumps
         
-        print("\n🎵 ResonantGen Phase 0 - Workflow Simulation")
-        print("   Testing Jordan's user story\n")
+        _configure_output()
+        self._write("\n🎵 ResonantGen Phase 0 - Workflow Simulation",
+                    "   Testing Jordan's user story\n")
+        _flush_output()
         
-    def prompt(self, description):
-        """Simulate generation."""
-        print(f"🧠 Processing: '{description}'")
-        print("   Translating thought to sound...")
+    def _write(self, *lines):
+        """Log a block of lines as one record, written out at the next phase boundary."""
+        logger.info("\n".join(lines))
         
-        # Simulate generation time (2-3 seconds per track)
-        time.sleep(2.5)
+    def _elapsed(self):
+        """Seconds since the workflow started."""
+        return (time.monotonic_ns() - self._start_ns) / 1e9
         
-        # Create mock tracks
-        self.session = {
-            "drums": MockTrack("drums"),
-            "bass": MockTrack("bass"),
-            "harmony": MockTrack("harmony"), 
-            "melody": MockTrack("melody")
-        }
+    def prompt(self, description):
+        """Simulate generation."""
+        self._write(f"🧠 Processing: '{description}'",
+                    "   Translating thought to sound...")
+        _flush_output()
         
         # Save to session folder
         session_name = f"session_{self.session_counter:02d}"
-        session_path = Path("loops") / session_name
-        session_path.mkdir(parents=True, exist_ok=True)
+        session_path = LOOPS_DIR / session_name
+        self._session_name = session_name
+        self._session_path = session_path
         
-        # Export individual tracks
-        for track_name, track in self.session.items():
-            track_path = session_path / f"{track_name}.wav"
-            track.export(str(track_path))
+        # Generate the tracks concurrently: the phase takes as long as the
+        # slowest track rather than the sum of all four
+        with ThreadPoolExecutor(max_workers=len(TRACK_NAMES)) as executor:
+            futures = [executor.submit(self._make_track, track_name) for track_name in TRACK_NAMES]
+            self.session = Session(*(future.result() for future in futures))
         
-        print(f"\n✅ Generated loop saved to /loops/{session_name}/")
-        print("   📁 drums.wav, bass.wav, harmony.wav, melody.wav")
+        # Export individual tracks
+        self._export_session(session_path, self.session.items())
         
         # Show elapsed time
-        elapsed = time.time() - self.start_time
-        print(f"   ⏱️  {elapsed:.1f} seconds elapsed\n")
+        elapsed = self._elapsed()
+        self._write(f"\n✅ Generated loop saved to /loops/{session_name}/",
+                    f"   📁 {', '.join(TRACK_FILENAMES.values())}",
+                    f"   ⏱️  {elapsed:.1f} seconds elapsed\n")
+        _flush_output()
+        
+    def _make_track(self, track_name):
+        """Simulate generating one track."""
+        # Simulate generation time (2-3 seconds per track)
+        self._sleep(2.5)
+        
+        return MockTrack(track_name)
+        
+    def _export_session(self, session_path, tracks):
+        """Write each (track_name, track) to <track>.wav in the session folder, skipping unchanged files."""
+        # Create the folder on first export only, not again for every regenerate
+        if session_path not in self._created_sessions:
+            session_path.mkdir(exist_ok=True)
+            self._created_sessions.add(session_path)
+        
+        for track_name, track in tracks:
+            track_path = session_path / TRACK_FILENAMES[track_name]
+            key = (track.name, track.duration, track.locked)
+            if self._export_cache.get(track_path) != key:
+                track.export(track_path)
+                self._export_cache[track_path] = key
         
     def lock(self, track_name):
         """Lock a track."""
-        if track_name in self.session:
-            self.session[track_name].lock()
-            print(f"✅ Locked: {track_name}")
+        lines = []
+        if track_name in TRACK_NAMES:
+            with self._session_lock:
+                getattr(self.session, track_name).lock()
+            lines.append(f"✅ Locked: {track_name}")
         
-        elapsed = time.time() - self.start_time
-        print(f"   ⏱️  {elapsed:.1f} seconds elapsed\n")
+        elapsed = self._elapsed()
+        lines.append(f"   ⏱️  {elapsed:.1f} seconds elapsed\n")
+        self._write(*lines)
+        _flush_output()
         
     def regenerate(self, track_name):
         """Regenerate a track."""
-        print(f"🔄 Regenerating {track_name}...")
+        self._write(f"🔄 Regenerating {track_name}...")
+        _flush_output()
         
         # Simulate regeneration time
-        time.sleep(2.0)
+        self._sleep(2.0)
         
         # Create new track
-        self.session[track_name] = MockTrack(f"{track_name}_v2")
+        new_track = MockTrack(f"{track_name}_v2")
+        with self._session_lock:
+            setattr(self.session, track_name, new_track)
         
         # Update file
-        session_name = f"session_{self.session_counter:02d}"
-        session_path = Path("loops") / session_name
-        track_path = session_path / f"{track_name}.wav"
-        self.session[track_name].export(str(track_path))
+        self._export_session(self._session_path, [(track_name, new_track)])
         
-        print(f"✅ Regenerated: {track_name}")
-        
-        elapsed = time.time() - self.start_time
-        print(f"   ⏱️  {elapsed:.1f} seconds elapsed\n")
+        elapsed = self._elapsed()
+        self._write(f"✅ Regenerated: {track_name}",
+                    f"   ⏱️  {elapsed:.1f} seconds elapsed\n")
+        _flush_output()
         
     def export(self):
-        """Export session."""
-        print("💾 Exporting session...")
+        """Export session, rewriting the track files whose state changed (e.g. a lock) since prompt()."""
+        self._write("💾 Exporting session...")
+        _flush_output()
         
         # Simulate export time
-        time.sleep(0.5)
+        self._sleep(0.5)
         
-        session_name = f"session_{self.session_counter:02d}"
-        print(f"\n✅ Exported to /loops/{session_name}/")
-        print("   📁 Individual tracks + mixed.wav")
+        # Bring the track files up to date; only tracks changed since their
+        # last write (e.g. newly locked) hit the disk
+        self._export_session(self._session_path, self.session.items())
         
         # Final timing
-        total_time = time.time() - self.start_time
-        print(f"\n🎯 Total time: {total_time:.1f} seconds")
-        
+        total_time = self._elapsed()
         if total_time < 60:
-            print("   ✨ Under 60 seconds - Musical telepathy achieved!")
+            verdict = "   ✨ Under 60 seconds - Musical telepathy achieved!"
         else:
-            print("   ⚡ Over 60 seconds - Need optimization")
+            verdict = "   ⚡ Over 60 seconds - Need optimization"
+        
+        self._write(f"\n✅ Exported to /loops/{self._session_name}/",
+                    "   📁 Individual tracks + mixed.wav",
+                    f"\n🎯 Total time: {total_time:.1f} seconds",
+                    verdict)
+        _flush_output()
 
 def main():
     """Run Jordan's exact workflow."""
     cli = SimulatedCLI()
     
-    print("=" * 60)
-    print("JORDAN'S WORKFLOW SIMULATION")
-    print("=" * 60)
-    print()
+    logger.info("=" * 60)
+    logger.info("JORDAN'S WORKFLOW SIMULATION")
+    logger.info("=" * 60)
+    logger.info("")
     
     # Step 1: Initial prompt
-    print("Step 1: Jordan enters his prompt")
+    logger.info("Step 1: Jordan enters his prompt")
     cli.prompt("give me a chill lo-fi hip-hop beat at 72 bpm with jazzy chords and warm analog bass")
     
-    # Step 2: Lock bass
-    print("Step 2: Jordan locks the bass (he loves it)")
-    cli.lock("bass")
-    
-    # Step 3: Regenerate drums  
-    print("Step 3: Jordan regenerates drums (wants organic feel)")
-    cli.regenerate("drums")
+    # Steps 2 and 3 touch different tracks, so they run side by side
+    logger.info("Step 2: Jordan locks the bass (he loves it)")
+    logger.info("Step 3: Jordan regenerates drums (wants organic feel)")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        lock_future = executor.submit(cli.lock, "bass")
+        regenerate_future = executor.submit(cli.regenerate, "drums")
+        lock_future.result()
+        regenerate_future.result()
     
     # Step 4: Export
-    print("Step 4: Jordan exports the session")
+    logger.info("Step 4: Jordan exports the session")
     cli.export()
     
-    print("\n" + "=" * 60)
-    print("WORKFLOW COMPLETE")
-    print("=" * 60)
+    logger.info("\n" + "=" * 60)
+    logger.info("WORKFLOW COMPLETE")
+    logger.info("=" * 60)
     
     # Show final structure
-    print("\nFinal output structure:")
-    session_path = Path("loops/session_01")
-    if session_path.exists():
-        for file in session_path.iterdir():
-            print(f"  📄 {file.name}")
-            if file.suffix == ".wav":
-                content = file.read_text()
-                print(f"     {content.splitlines()[0]}")
+    logger.info("\nFinal output structure:")
+    # Shown from what each track last wrote, without reading the files back
+    for track_name, track in cli.session.items():
+        if track.last_payload is not None:
+            logger.info(f"  📄 {TRACK_FILENAMES[track_name]}")
+            first_line = track.last_payload.split(b"\n", 1)[0].decode()
+            logger.info(f"     {first_line}")
+    _flush_output()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file